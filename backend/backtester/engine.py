@@ -38,11 +38,11 @@ class BacktestEngine:
                 'AAPL' → 개별 종목 모드
         """
         if ticker:
-            df = df[df['ticker'] == ticker].copy()
+            df = df[df['ticker'] == ticker]
 
         # ── 1단계: 날짜 문자열 정규화 ─────────────────────────────────────
-        df = df.copy()
-        df['date_str'] = df['date'].astype(str).str[:10]
+        # assign: 새 프레임 1회 생성 (입력 df는 변경하지 않음, 별도 .copy() 불필요)
+        df = df.assign(date_str=df['date'].astype(str).str[:10])
 
         tickers = df['ticker'].unique()
         total = len(tickers)
@@ -50,7 +50,7 @@ class BacktestEngine:
         # ── 2단계: 신호 계산 + signal_dates 인덱스 ────────────────────────
         # signal_dates[date_str] = [ticker, ...] — 그날 매수 신호 있는 종목만
         signal_dates: dict = {}
-        for idx, (t, group) in enumerate(df.groupby('ticker', sort=False)):
+        for idx, (t, group) in enumerate(df.groupby('ticker', sort=False, observed=True)):
             group = group.reset_index(drop=True)
             try:
                 sig = parse_conditions(group, conditions)
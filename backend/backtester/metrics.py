@@ -3,7 +3,6 @@
 Profit Factor, Information Ratio, 기대값(EV), 샘플 신뢰도
 """
 import pandas as pd
-from statistics import mean
 
 MIN_TRADES_MEDIUM = 30
 MIN_TRADES_HIGH = 100
@@ -34,17 +33,21 @@ def calculate_metrics(
     # CAGR
     cagr = (final_value / initial_cash) ** (1 / years) - 1
 
+    # 일별 수익률 평균/표준편차 (Sharpe, Sortino, Volatility 공용)
+    ret_mean = returns.mean()
+    ret_std  = returns.std()
+
     # Sharpe
     sharpe = (
-        (returns.mean() / returns.std()) * (252 ** 0.5)
-        if returns.std() > 0 else 0
+        (ret_mean / ret_std) * (252 ** 0.5)
+        if ret_std > 0 else 0
     )
 
     # Sortino
     downside = returns[returns < 0]
     downside_std = downside.std()
     sortino = (
-        (returns.mean() / downside_std) * (252 ** 0.5)
+        (ret_mean / downside_std) * (252 ** 0.5)
         if downside_std > 0 else 0
     )
 
@@ -54,18 +57,27 @@ def calculate_metrics(
     max_drawdown = drawdown.min()
 
     # Volatility
-    volatility = returns.std() * (252 ** 0.5)
+    volatility = ret_std * (252 ** 0.5)
 
     # Calmar
     calmar = cagr / abs(max_drawdown) if max_drawdown != 0 else 0
 
+    # 거래 통계 (1회 순회): 승/패 횟수, 총이익/총손실
+    win_count = loss_count = 0
+    total_profit = total_loss = 0.0
+    for t in trades:
+        pnl = t.get('pnl', 0)
+        if pnl > 0:
+            win_count += 1
+            total_profit += pnl
+        elif pnl < 0:
+            loss_count += 1
+            total_loss -= pnl
+
     # Win Rate
-    winning_trades = [t for t in trades if t.get('pnl', 0) > 0]
-    win_rate = len(winning_trades) / len(trades) * 100 if trades else 0
+    win_rate = win_count / len(trades) * 100 if trades else 0
 
     # Profit Factor
-    total_profit = sum(t['pnl'] for t in trades if t.get('pnl', 0) > 0)
-    total_loss = abs(sum(t['pnl'] for t in trades if t.get('pnl', 0) < 0))
     profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
 
     # Information Ratio
@@ -79,11 +91,8 @@ def calculate_metrics(
     # 기대값 (EV)
     expected_value = 0.0
     if trades:
-        pnls = [t['pnl'] for t in trades]
-        wins = [p for p in pnls if p > 0]
-        losses = [p for p in pnls if p < 0]
-        avg_win = mean(wins) if wins else 0
-        avg_loss = mean(losses) if losses else 0
+        avg_win = total_profit / win_count if win_count else 0
+        avg_loss = -total_loss / loss_count if loss_count else 0
         wr = win_rate / 100
         expected_value = wr * avg_win + (1 - wr) * avg_loss
 
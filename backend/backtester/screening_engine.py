@@ -4,7 +4,7 @@
 등장일로부터 N영업일 후 매수 → M영업일 후(또는 손절/익절 시) 청산
 
 최적화:
-  1. OHLCV 룩업: itertuples → groupby + to_dict (C 레벨 변환)
+  1. OHLCV 룩업: 종목별 groupby 1회로 numpy 배열을 만들고 룩업 dict도 같은 배열에서 생성
   2. 청산 로직 벡터화: 진입 시점에 numpy로 손절/익절/보유기간 만료일을
      미리 계산 → 메인 루프에서 date >= exit_date 비교만 수행
 """
@@ -21,6 +21,7 @@ class ScreeningBacktestEngine:
     entry_signals   : [{ticker, screening_date}, ...]
     available_dates : 영업일 목록 (내/오름차순 모두 허용, 자동 정렬)
     ohlcv_df        : pandas DataFrame (date, ticker, open, high, low, close)
+                      종목 내 date 오름차순 정렬 전제 (SQL ORDER BY ticker, date)
     entry_config    : {days_after: int, price: 'open'|'close'}
     exit_rules      : {hold_days: int, stop_loss: float|None, take_profit: float|None}
     initial_cash    : float
@@ -35,39 +36,36 @@ class ScreeningBacktestEngine:
         if not entry_signals or not available_dates:
             return {'equity_curve': [], 'trades': [], 'metrics': {}}
 
+        names = ticker_names or {}
+
         # ── 날짜 인덱스 구성 (오름차순) ──────────────────────────────────
         dates_asc = sorted(set(available_dates))
         date_to_idx = {d: i for i, d in enumerate(dates_asc)}
 
-        # ── 최적화 1: OHLCV 룩업 (groupby + to_dict) ─────────────────────
+        # ── 최적화 1: OHLCV 룩업 + numpy 배열 (groupby 1회) ──────────────
         # date_str 컬럼 확보
         if 'date_str' not in ohlcv_df.columns:
-            ohlcv_df = ohlcv_df.copy()
-            ohlcv_df['date_str'] = ohlcv_df['date'].apply(
-                lambda d: d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d)
-            )
+            ohlcv_df = ohlcv_df.assign(
+                date_str=pd.to_datetime(ohlcv_df['date']).dt.strftime('%Y-%m-%d'))
 
-        # {ticker: {date_str: {open, high, low, close}}}
+        # 종목별로 한 번만 변환:
+        #   ticker_arrays: {ticker: {dates, date_to_i, open, high, low, close(np.ndarray)}}
+        #   ohlcv        : {ticker: {date_str: {open, high, low, close}}} (같은 배열에서 생성)
         ohlcv: dict = {}
-        for ticker_val, group in ohlcv_df.groupby('ticker'):
-            ohlcv[str(ticker_val)] = (
-                group.set_index('date_str')[['open', 'high', 'low', 'close']]
-                .to_dict('index')
-            )
-
-        # ── 최적화 2: 종목별 numpy 배열 (벡터화 청산 계산용) ─────────────
         ticker_arrays: dict = {}
-        for ticker_val, t_ohlcv in ohlcv.items():
-            sorted_dates = sorted(t_ohlcv.keys())
-            if not sorted_dates:
-                continue
-            ticker_arrays[ticker_val] = {
-                'dates':    np.array(sorted_dates),
-                'date_to_i': {d: i for i, d in enumerate(sorted_dates)},
-                'open':  np.array([t_ohlcv[d]['open']  for d in sorted_dates], dtype=float),
-                'high':  np.array([t_ohlcv[d]['high']  for d in sorted_dates], dtype=float),
-                'low':   np.array([t_ohlcv[d]['low']   for d in sorted_dates], dtype=float),
-                'close': np.array([t_ohlcv[d]['close'] for d in sorted_dates], dtype=float),
+        for ticker_val, group in ohlcv_df.groupby('ticker', observed=True):
+            date_list = group['date_str'].tolist()
+            cols = {c: group[c].to_numpy(dtype=float) for c in ('open', 'high', 'low', 'close')}
+            t = str(ticker_val)
+            ticker_arrays[t] = {
+                'dates':     np.array(date_list),
+                'date_to_i': {d: i for i, d in enumerate(date_list)},
+                **cols,
+            }
+            ohlcv[t] = {
+                d: {'open': o, 'high': h, 'low': l, 'close': c}
+                for d, o, h, l, c in zip(date_list, cols['open'].tolist(), cols['high'].tolist(),
+                                         cols['low'].tolist(), cols['close'].tolist())
             }
 
         # ── N 영업일 후 날짜 계산 ─────────────────────────────────────────
@@ -99,7 +97,7 @@ class ScreeningBacktestEngine:
         take_profit_pct  = exit_rules.get('take_profit')   # 양수 (예: 10)
         entry_price_type = entry_config.get('price', 'open')
 
-        # ── 최적화 3: 진입 시점에 numpy로 청산일/가격/사유 사전 계산 ──────
+        # ── 최적화 2: 진입 시점에 numpy로 청산일/가격/사유 사전 계산 ──────
         def compute_exit(ticker: str, entry_date_str: str, entry_price: float) -> dict:
             """
             진입일·진입가 기준으로 numpy 슬라이싱으로 청산 정보를 미리 결정.
@@ -226,7 +224,7 @@ class ScreeningBacktestEngine:
 
                 trades.append({
                     'ticker':      ticker,
-                    'name':        (ticker_names or {}).get(ticker, ''),
+                    'name':        names.get(ticker, ''),
                     'entry_date':  pos['entry_date'],
                     'exit_date':   date_str,
                     'entry_price': round(pos['entry_price'], 4),
@@ -293,7 +291,7 @@ class ScreeningBacktestEngine:
                 pnl_pct  = (ep_exit / pos['entry_price'] - 1) * 100
                 trades.append({
                     'ticker':      ticker,
-                    'name':        (ticker_names or {}).get(ticker, ''),
+                    'name':        names.get(ticker, ''),
                     'entry_date':  pos['entry_date'],
                     'exit_date':   last_date,
                     'entry_price': round(pos['entry_price'], 4),
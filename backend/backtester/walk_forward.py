@@ -22,8 +22,7 @@ def walk_forward(
     engine = BacktestEngine()
     results = []
 
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['date'])
+    df = df.assign(date=pd.to_datetime(df['date']))
     start = df['date'].min()
     end = df['date'].max()
 
@@ -34,16 +33,16 @@ def walk_forward(
         if test_end > end:
             break
 
-        train_df = df[(df['date'] >= window_start) & (df['date'] < train_end)].copy()
-        test_df = df[(df['date'] >= train_end) & (df['date'] < test_end)].copy()
+        train_df = df[(df['date'] >= window_start) & (df['date'] < train_end)]
+        test_df = df[(df['date'] >= train_end) & (df['date'] < test_end)]
 
         if train_df.empty or test_df.empty:
             window_start += pd.DateOffset(years=test_years)
             continue
 
-        # date를 문자열로 되돌리기 (engine이 문자열 비교 사용)
-        train_df['date'] = train_df['date'].astype(str)
-        test_df['date'] = test_df['date'].astype(str)
+        # date를 문자열로 되돌리기 (engine이 문자열 비교 사용) - assign으로 슬라이스 복사 1회만
+        train_df = train_df.assign(date=train_df['date'].astype(str))
+        test_df = test_df.assign(date=test_df['date'].astype(str))
 
         in_result = engine.run(train_df, conditions, exit_rules, initial_cash, market)
         out_result = engine.run(test_df, conditions, exit_rules, initial_cash, market)
@@ -4,26 +4,47 @@ Stock 통합 API 서버
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 from pathlib import Path
+import anyio.to_thread
 import asyncpg
 import redis.asyncio as aioredis
 
 from services.data_manager import StockDataManager
 from services.user_manager import UserManager
+from services.auth_service import close_http_client
 from middleware.auth_middleware import AuthMiddleware
 from routers import kr_stock, us_stock, user, auth, admin, backtest, market_indices
-from config import DATABASE_URL, ALLOWED_ORIGINS, REDIS_URL
+from config import ENV, DATABASE_URL, ALLOWED_ORIGINS, REDIS_URL
 
 # --- 경로 설정 ---
 BASE_DIR = Path(__file__).resolve().parent  # backend/ 폴더
 USER_DATA_DIR = BASE_DIR / "user_data"
 FRONTEND_DIST = BASE_DIR.parent / "frontend" / "dist"
 
-# --- 사용자 매니저 인스턴스 ---
-user_manager = UserManager(str(USER_DATA_DIR))
+# 동기(def) 핸들러/블로킹 호출이 사용하는 스레드풀 크기 (Starlette 기본값 40)
+THREADPOOL_TOKENS = 200
+
+
+class SPAStaticFiles(StaticFiles):
+    """프론트엔드 정적 파일 서빙 - 없는 경로는 index.html로 폴백 (SPA 라우팅)"""
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as e:
+            # API 요청은 index.html로 돌리지 않음
+            if e.status_code != 404 or path.startswith("api/"):
+                raise
+            return await super().get_response("index.html", scope)
+
+
+# --- 사용자 매니저 인스턴스 (로컬 개발 시에만 들여쓴 JSON으로 저장) ---
+user_manager = UserManager(str(USER_DATA_DIR), pretty=(ENV == 'local'))
 
 
 @asynccontextmanager
@@ -33,6 +54,8 @@ async def lifespan(app: FastAPI):
     print("Stock 통합 API 서버 시작")
     print("=" * 50)
 
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+
     # DB 커넥션 풀 생성
     app.state.db_pool = await asyncpg.create_pool(
         DATABASE_URL,
@@ -58,6 +81,14 @@ async def lifespan(app: FastAPI):
     kr_stock.set_data_manager(app.state.kr_manager)
     us_stock.set_data_manager(app.state.us_manager)
     user.set_user_manager(user_manager)
+    if not user_manager.claim_data_dir():
+        # uvicorn --workers / gunicorn -w / WEB_CONCURRENCY 등으로 워커가 여럿 뜬 경우
+        print("!" * 50)
+        print("경고: 다른 프로세스가 같은 사용자 데이터 폴더를 사용 중입니다.")
+        print("  사용자 캐시/지연 쓰기가 워커별이라 즐겨찾기/메모 변경이 유실될 수 있습니다.")
+        print("  워커 1개로 실행하세요 (WEB_CONCURRENCY=1, --workers 1).")
+        print("!" * 50)
+    user_manager.start_writer()
     backtest.set_data_managers(app.state.kr_manager, app.state.us_manager)
     market_indices.set_db_pool(app.state.db_pool)
 
@@ -73,7 +104,9 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # 서버 종료 시 풀 정리
+    # 서버 종료 시 대기 중인 사용자 데이터 저장 + 풀 정리
+    await user_manager.stop_writer()
+    await close_http_client()
     if app.state.redis:
         await app.state.redis.close()
     await app.state.db_pool.close()
@@ -86,6 +119,7 @@ app = FastAPI(
     description="한국주식 + 미국주식 통합 API",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson 직렬화 (대용량 차트/분석 응답)
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
@@ -103,6 +137,9 @@ app.add_middleware(
 # 인증 미들웨어 등록 (CORS 미들웨어 다음에)
 app.add_middleware(AuthMiddleware)
 
+# 응답 압축 — 차트/분석 JSON (1KB 이상)만 gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # API 라우터 등록
 app.include_router(kr_stock.router, prefix="/api/kr",    tags=["한국주식"])
 app.include_router(us_stock.router, prefix="/api/us",    tags=["미국주식"])
@@ -127,21 +164,8 @@ if FRONTEND_DIST.exists():
     # 정적 파일 (JS, CSS, 이미지 등)
     app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIST / "assets")), name="assets")
 
-    # SPA 라우팅 - API가 아닌 모든 요청을 index.html로
-    @app.get("/{full_path:path}")
-    async def serve_spa(request: Request, full_path: str):
-        """SPA 라우팅 - index.html 서빙"""
-        # API 요청은 제외
-        if full_path.startswith("api/"):
-            return {"error": "Not found"}
-
-        # 정적 파일 확인
-        file_path = FRONTEND_DIST / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-
-        # 나머지는 index.html (SPA 라우팅)
-        return FileResponse(FRONTEND_DIST / "index.html")
+    # SPA 라우팅 - 정적 파일이 있으면 그대로, 없으면 index.html (API 경로 제외)
+    app.mount("/", SPAStaticFiles(directory=str(FRONTEND_DIST), html=True), name="spa")
 else:
     @app.get("/")
     async def root():
@@ -161,6 +185,7 @@ else:
 
 if __name__ == "__main__":
     import uvicorn
+    # 단일 워커 전용 (UserManager가 프로세스별 캐시/지연 쓰기 사용 - 워커가 여럿이면 lifespan에서 경고)
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
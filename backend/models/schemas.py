@@ -1,7 +1,7 @@
 """
 Pydantic 스키마 정의
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date
 
@@ -9,6 +9,8 @@ from datetime import date
 # --- 공통 스키마 ---
 class StockRecord(BaseModel):
     """주식 데이터 레코드"""
+    model_config = ConfigDict(from_attributes=True)
+
     날짜: str
     종목코드: Optional[str] = None  # 한국주식
     티커: Optional[str] = None  # 미국주식
@@ -21,9 +23,6 @@ class StockRecord(BaseModel):
     거래대금: float
     전일대비변동률: float
 
-    class Config:
-        from_attributes = True
-
 
 class ChartPoint(BaseModel):
     """차트 데이터 포인트"""
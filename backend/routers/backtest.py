@@ -7,6 +7,7 @@ GET  /api/backtest/presets      → 프리셋 목록 조회
 """
 import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from celery.result import AsyncResult
 
 from celery_app import celery_app
@@ -260,9 +261,10 @@ async def request_screening_backtest(body: dict, user=Depends(require_premium)):
         end_date   = screening.get('end_date')
         if not start_date or not end_date:
             raise HTTPException(status_code=400, detail="date_mode=range일 때 start_date, end_date가 필요합니다.")
-        dates_info     = await dm.get_available_dates()
-        dates_to_screen = [d for d in dates_info['dates'] if start_date <= d <= end_date]
-        dates_to_screen.sort()  # 오름차순
+        try:
+            dates_to_screen = await dm.get_trading_dates_between(start_date, end_date)  # 오름차순
+        except ValueError:
+            raise HTTPException(status_code=400, detail="날짜 형식은 YYYY-MM-DD여야 합니다.")
 
     if not dates_to_screen:
         raise HTTPException(status_code=400, detail="해당 기간에 데이터가 없습니다.")
@@ -280,7 +282,9 @@ async def request_screening_backtest(body: dict, user=Depends(require_premium)):
     tickers_manual = [t.strip().upper() for t in (screening.get('tickers') or []) if t.strip()]
     top_n = len(tickers_manual) if tickers_manual else (screening.get('top_n') or 10)
 
-    task = run_screening_backtest.delay(
+    # 브로커 publish는 동기 I/O → 스레드풀에서 실행 (이벤트 루프 블로킹 방지)
+    task = await run_in_threadpool(
+        run_screening_backtest.delay,
         market=market,
         entry_signals=entry_signals,
         entry_config=body.get('entry', {'days_after': 0, 'price': 'open'}),
@@ -296,9 +300,10 @@ async def request_screening_backtest(body: dict, user=Depends(require_premium)):
 
 
 @router.post("")
-async def request_backtest(body: dict, user=Depends(require_premium)):
+def request_backtest(body: dict, user=Depends(require_premium)):
     """
     지표 기반 백테스팅 요청 (하위 호환 유지)
+    동기 핸들러: 브로커 publish가 블로킹 I/O라 스레드풀에서 실행
     """
     market = body.get('market', 'kr')
     if market not in ('kr', 'us'):
@@ -328,8 +333,9 @@ async def request_backtest(body: dict, user=Depends(require_premium)):
 
 
 @router.get("/{task_id}")
-async def get_backtest_result(task_id: str, user=Depends(get_current_user)):
+def get_backtest_result(task_id: str, user=Depends(get_current_user)):
     """
+    동기 핸들러: AsyncResult 상태 조회가 Redis 블로킹 호출이라 스레드풀에서 실행
     진행 중: {"status": "PROGRESS", "current": 60, "total": 100, "step": "..."}
     완료:   {"status": "SUCCESS", "result": {...}}
     실패:   {"status": "FAILURE", "error": "..."}
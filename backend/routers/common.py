@@ -0,0 +1,21 @@
+"""
+라우터 공통 유틸 (kr/us 공용)
+"""
+import hashlib
+
+import orjson
+from fastapi import Request, Response
+
+
+def etag_response(request: Request, content) -> Response:
+    """
+    응답 본문 해시로 약한 ETag 부여. If-None-Match 일치 시 304 (직렬화 결과 전송 생략)
+    데이터는 수집 스크립트 실행 시에만 바뀌므로 no-cache (매번 재검증)로 설정
+    """
+    body = orjson.dumps(content, default=str)
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,12 +1,17 @@
 """
 미국주식 API 라우터
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
+from routers.common import etag_response
+
+# 응답은 ORJSONResponse로 직접 반환 (default_response_class만으로는 반환값이 jsonable_encoder 순회를 거침)
+
 router = APIRouter()
 
-# data_manager는 main.py에서 주입됨
+# data_manager는 main.py lifespan에서 주입됨 (요청 처리 전에 항상 설정되므로 핸들러별 None 체크 없음)
 us_data_manager = None
 
 
@@ -17,24 +22,15 @@ def set_data_manager(manager):
 
 
 @router.get("/dates")
-async def get_dates():
+async def get_dates(request: Request):
     """사용 가능한 날짜 목록 반환"""
-    if us_data_manager is None:
-        return {"dates": [], "initial_year": 2024, "initial_month": 1,
-                "min_year": 2024, "max_year": 2024}
-    return await us_data_manager.get_available_dates()
+    return etag_response(request, await us_data_manager.get_available_dates())
 
 
 @router.get("/data")
-async def get_data(date: str = Query(..., description="날짜 (YYYY-MM-DD)")):
+async def get_data(request: Request, date: str = Query(..., description="날짜 (YYYY-MM-DD)")):
     """특정 날짜의 가격대별 데이터 반환"""
-    if us_data_manager is None:
-        return {
-            "high_price_volume": [], "high_price_rate": [],
-            "mid_price_volume":  [], "mid_price_rate":  [],
-            "low_price_volume":  [], "low_price_rate":  []
-        }
-    return await us_data_manager.get_us_day_data(date)
+    return etag_response(request, await us_data_manager.get_us_day_data(date))
 
 
 @router.get("/frequent")
@@ -44,9 +40,7 @@ async def get_frequent_stocks(
     category: str = Query("high_price_volume", description="카테고리")
 ):
     """빈출 종목 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_frequent_stocks(date, weeks, category)
+    return ORJSONResponse(await us_data_manager.get_frequent_stocks(date, weeks, category))
 
 
 @router.get("/pullback")
@@ -56,9 +50,7 @@ async def get_pullback_stocks(
     category: str = Query("high_price_volume", description="카테고리")
 ):
     """눌림목 종목 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_pullback_stocks(date, days_ago, category)
+    return ORJSONResponse(await us_data_manager.get_pullback_stocks(date, days_ago, category))
 
 
 @router.get("/consecutive")
@@ -68,9 +60,7 @@ async def get_consecutive_rise_stocks(
     category: str = Query("high_price_volume", description="카테고리")
 ):
     """연속 상승 종목 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_consecutive_rise_stocks(date, days, category)
+    return ORJSONResponse(await us_data_manager.get_consecutive_rise_stocks(date, days, category))
 
 
 @router.get("/52week-high")
@@ -81,10 +71,8 @@ async def get_52week_high_stocks(
     category: str = Query("high_price_volume", description="카테고리"),
 ):
     """처음으로 52주 신고가를 달성한 종목 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_52week_high_stocks(
-        date, consolidation_days, range_pct, category)
+    return ORJSONResponse(await us_data_manager.get_52week_high_stocks(
+        date, consolidation_days, range_pct, category))
 
 
 @router.get("/history")
@@ -95,10 +83,7 @@ async def get_stock_history(
     interval: str = Query("daily", description="봉 간격 (daily/weekly/monthly)")
 ):
     """종목 차트 데이터 반환"""
-    if us_data_manager is None:
-        return {"line": [], "candle": [], "volume": [], "change": {},
-                "ma20": [], "ma240": [], "end_date": end_date}
-    return await us_data_manager.get_stock_history(ticker, days, end_date, interval)
+    return ORJSONResponse(await us_data_manager.get_stock_history(ticker, days, end_date, interval))
 
 
 @router.get("/overview")
@@ -106,9 +91,7 @@ async def get_stock_overview(
     ticker: str = Query(..., description="티커")
 ):
     """종목 기업개요 반환"""
-    if us_data_manager is None:
-        return {'ticker': ticker, 'industry': '', 'overview': ''}
-    return await us_data_manager.get_stock_overview(ticker)
+    return ORJSONResponse(await us_data_manager.get_stock_overview(ticker))
 
 
 @router.get("/earnings")
@@ -116,9 +99,7 @@ async def get_stock_earnings(
     ticker: str = Query(..., description="티커")
 ):
     """종목 실적 데이터 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_stock_earnings(ticker)
+    return ORJSONResponse(await us_data_manager.get_stock_earnings(ticker))
 
 
 @router.get("/financials")
@@ -126,17 +107,13 @@ async def get_stock_financials(
     ticker: str = Query(..., description="티커")
 ):
     """종목 재무제표 데이터 반환"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_stock_financials(ticker)
+    return ORJSONResponse(await us_data_manager.get_stock_financials(ticker))
 
 
 @router.get("/tickers")
 async def get_all_tickers():
     """전체 종목 목록 반환 (클라이언트 사이드 검색용)"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_all_tickers()
+    return ORJSONResponse(await us_data_manager.get_all_tickers())
 
 
 @router.get("/search")
@@ -145,9 +122,7 @@ async def search_stock(
     limit: int = Query(50, description="최대 결과 수")
 ):
     """종목 검색"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.search_stocks(q, limit)
+    return ORJSONResponse(await us_data_manager.search_stocks(q, limit))
 
 
 @router.get("/gap-analysis")
@@ -168,14 +143,12 @@ async def get_gap_analysis(
     direction: str = Query("up", description="방향 (up/down)")
 ):
     """갭 상승/하락 분석 데이터 조회"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_gap_analysis(
+    return ORJSONResponse(await us_data_manager.get_gap_analysis(
         start_date, end_date, base_price, compare_price, min_rate, max_rate,
         extra_base, extra_compare, extra_direction,
         detail_base, detail_compare, detail_direction,
         ticker_filter, direction
-    )
+    ))
 
 
 @router.get("/new-listings")
@@ -184,6 +157,4 @@ async def get_new_listings(
     end_date: str = Query(..., description="종료일 (YYYY-MM-DD)"),
 ):
     """신규 상장 종목 조회"""
-    if us_data_manager is None:
-        return []
-    return await us_data_manager.get_new_listings(start_date, end_date)
+    return ORJSONResponse(await us_data_manager.get_new_listings(start_date, end_date))
@@ -2,12 +2,10 @@
 사용자 데이터 API 라우터 (폴더/즐겨찾기/메모)
 로그인 필수: request.state.user (auth_middleware에서 설정)
 """
-from fastapi import APIRouter, Query, Request, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Any
 
-router = APIRouter()
-
 # user_manager는 main.py에서 주입됨
 user_manager = None
 
@@ -18,8 +16,17 @@ def set_user_manager(manager):
     user_manager = manager
 
 
-def get_user_id(request: Request) -> str:
-    """로그인된 사용자 ID 반환. 비로그인 시 401."""
+async def require_user_manager():
+    """유저 매니저 준비 여부 확인 (라우터 공통 의존성). 미설정 시 503."""
+    if user_manager is None:
+        raise HTTPException(status_code=503, detail="서비스 초기화 중")
+
+
+router = APIRouter(dependencies=[Depends(require_user_manager)])
+
+
+async def get_user_id(request: Request) -> str:
+    """로그인된 사용자 ID 반환. 비로그인 시 401. (async 의존성 → 스레드풀 경유 없음)"""
     user = request.state.user
     if not user:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
@@ -80,52 +87,49 @@ class MemoDeleteRequest(BaseModel):
     market: str = "kr"
 
 
+class FavoriteBatchAddRequest(BaseModel):
+    items: list[FavoriteAddRequest]
+
+
+class FavoriteBatchRemoveRequest(BaseModel):
+    items: list[FavoriteRemoveRequest]
+
+
+class MemoBatchSaveRequest(BaseModel):
+    items: list[MemoSaveRequest]
+
+
 # --- 폴더 API ---
 @router.get("/folders")
-async def get_folders(request: Request):
+async def get_folders(user_id: str = Depends(get_user_id)):
     """폴더 목록 반환"""
-    if user_manager is None:
-        return []
-    user_id = get_user_id(request)
     return user_manager.get_folders(user_id)
 
 
 @router.post("/folder/create")
-async def create_folder(request: Request, body: FolderCreateRequest):
+async def create_folder(body: FolderCreateRequest, user_id: str = Depends(get_user_id)):
     """폴더 생성"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     folder = user_manager.create_folder(user_id, body.name)
     return {"success": True, "folder": folder}
 
 
 @router.post("/folder/delete")
-async def delete_folder(request: Request, body: FolderDeleteRequest):
+async def delete_folder(body: FolderDeleteRequest, user_id: str = Depends(get_user_id)):
     """폴더 삭제"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.delete_folder(user_id, body.folder_id)
     return {"success": success}
 
 
 @router.post("/folder/rename")
-async def rename_folder(request: Request, body: FolderRenameRequest):
+async def rename_folder(body: FolderRenameRequest, user_id: str = Depends(get_user_id)):
     """폴더 이름 변경"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.rename_folder(user_id, body.folder_id, body.new_name)
     return {"success": success}
 
 
 @router.post("/folder/reorder")
-async def reorder_folders(request: Request, body: FolderReorderRequest):
+async def reorder_folders(body: FolderReorderRequest, user_id: str = Depends(get_user_id)):
     """폴더 순서 변경"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.reorder_folders(user_id, body.folder_ids)
     return {"success": success}
 
@@ -133,74 +137,67 @@ async def reorder_folders(request: Request, body: FolderReorderRequest):
 # --- 즐겨찾기 API ---
 @router.get("/favorites")
 async def get_favorites(
-    request: Request,
-    folder_id: str = Query("default", description="폴더 ID")
+    folder_id: str = Query("default", description="폴더 ID"),
+    user_id: str = Depends(get_user_id),
 ):
     """폴더의 즐겨찾기 목록 반환"""
-    if user_manager is None:
-        return []
-    user_id = get_user_id(request)
     return user_manager.get_favorites(user_id, folder_id)
 
 
 @router.get("/favorites/all")
-async def get_all_favorites(request: Request):
+async def get_all_favorites(user_id: str = Depends(get_user_id)):
     """모든 즐겨찾기 목록 반환"""
-    if user_manager is None:
-        return []
-    user_id = get_user_id(request)
     return user_manager.get_all_favorites(user_id)
 
 
 @router.post("/favorite/add")
-async def add_favorite(request: Request, body: FavoriteAddRequest):
+async def add_favorite(body: FavoriteAddRequest, user_id: str = Depends(get_user_id)):
     """즐겨찾기 추가"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.add_favorite(user_id, body.folder_id, body.code, body.name, body.market)
     return {"success": success}
 
 
 @router.post("/favorite/remove")
-async def remove_favorite(request: Request, body: FavoriteRemoveRequest):
+async def remove_favorite(body: FavoriteRemoveRequest, user_id: str = Depends(get_user_id)):
     """즐겨찾기 제거"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.remove_favorite(user_id, body.folder_id, body.code, body.market)
     return {"success": success}
 
 
 @router.post("/favorite/move")
-async def move_favorite(request: Request, body: FavoriteMoveRequest):
+async def move_favorite(body: FavoriteMoveRequest, user_id: str = Depends(get_user_id)):
     """즐겨찾기 이동"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.move_favorite(user_id, body.code, body.from_folder, body.to_folder, body.market)
     return {"success": success}
 
 
+@router.post("/favorites/add")
+async def add_favorites(body: FavoriteBatchAddRequest, user_id: str = Depends(get_user_id)):
+    """즐겨찾기 일괄 추가 (파일 저장 1회)"""
+    added = user_manager.add_favorites(user_id, [item.model_dump() for item in body.items])
+    return {"success": True, "added": added}
+
+
+@router.post("/favorites/remove")
+async def remove_favorites(body: FavoriteBatchRemoveRequest, user_id: str = Depends(get_user_id)):
+    """즐겨찾기 일괄 제거 (파일 저장 1회)"""
+    removed = user_manager.remove_favorites(user_id, [item.model_dump() for item in body.items])
+    return {"success": True, "removed": removed}
+
+
 @router.get("/favorite/check")
 async def check_favorite(
-    request: Request,
     code: str = Query(..., description="종목코드/티커"),
-    market: str = Query("kr", description="마켓 (kr/us)")
+    market: str = Query("kr", description="마켓 (kr/us)"),
+    user_id: str = Depends(get_user_id),
 ):
     """즐겨찾기 여부 확인"""
-    if user_manager is None:
-        return {"is_favorite": False, "folder_id": None, "folder_name": None}
-    user_id = get_user_id(request)
     return user_manager.is_favorite(user_id, code, market)
 
 
 @router.post("/favorite/reorder")
-async def reorder_favorites(request: Request, body: FavoriteReorderRequest):
+async def reorder_favorites(body: FavoriteReorderRequest, user_id: str = Depends(get_user_id)):
     """즐겨찾기 순서 변경"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.reorder_favorites(user_id, body.folder_id, body.favorite_keys)
     return {"success": success}
 
@@ -208,34 +205,32 @@ async def reorder_favorites(request: Request, body: FavoriteReorderRequest):
 # --- 메모 API ---
 @router.get("/memo")
 async def get_memo(
-    request: Request,
     code: str = Query(..., description="종목코드/티커"),
-    market: str = Query("kr", description="마켓 (kr/us)")
+    market: str = Query("kr", description="마켓 (kr/us)"),
+    user_id: str = Depends(get_user_id),
 ):
     """메모 조회"""
-    if user_manager is None:
-        return {"memo": ""}
-    user_id = get_user_id(request)
     memo = user_manager.get_memo(user_id, code, market)
     return {"memo": memo}
 
 
 @router.post("/memo/save")
-async def save_memo(request: Request, body: MemoSaveRequest):
+async def save_memo(body: MemoSaveRequest, user_id: str = Depends(get_user_id)):
     """메모 저장"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.set_memo(user_id, body.code, body.memo, body.market)
     return {"success": success}
 
 
+@router.post("/memos/save")
+async def save_memos(body: MemoBatchSaveRequest, user_id: str = Depends(get_user_id)):
+    """메모 일괄 저장 (파일 저장 1회)"""
+    saved = user_manager.set_memos(user_id, [item.model_dump() for item in body.items])
+    return {"success": True, "saved": saved}
+
+
 @router.post("/memo/delete")
-async def delete_memo(request: Request, body: MemoDeleteRequest):
+async def delete_memo(body: MemoDeleteRequest, user_id: str = Depends(get_user_id)):
     """메모 삭제"""
-    if user_manager is None:
-        return {"success": False, "error": "서비스 초기화 중"}
-    user_id = get_user_id(request)
     success = user_manager.delete_memo(user_id, body.code, body.market)
     return {"success": success}
 
@@ -288,9 +283,6 @@ async def get_favorite_prices(request: Request, body: FavoritePricesRequest):
 
 
 @router.get("/memos/all")
-async def get_all_memos(request: Request):
+async def get_all_memos(user_id: str = Depends(get_user_id)):
     """모든 메모 목록 반환"""
-    if user_manager is None:
-        return []
-    user_id = get_user_id(request)
     return user_manager.get_all_memos(user_id)
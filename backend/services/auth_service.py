@@ -8,29 +8,49 @@ from datetime import datetime, timedelta
 from config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_HOURS
 
 
+# Google API 호출용 공유 클라이언트 (커넥션/TLS 세션 재사용, HTTP/2)
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 httpx 클라이언트 반환 (첫 호출 시 생성)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(http2=True, timeout=10.0)
+    return _http_client
+
+
+async def close_http_client():
+    """공유 httpx 클라이언트 종료 (lifespan 종료 시 호출)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 async def exchange_google_code(code: str, redirect_uri: str) -> dict:
     """Google authorization code → access_token + 사용자 정보"""
-    async with httpx.AsyncClient() as client:
-        # 1) code → token 교환
-        token_resp = await client.post(
-            'https://oauth2.googleapis.com/token',
-            data={
-                'code': code,
-                'client_id': GOOGLE_CLIENT_ID,
-                'client_secret': GOOGLE_CLIENT_SECRET,
-                'redirect_uri': redirect_uri,
-                'grant_type': 'authorization_code',
-            }
-        )
-        token_data = token_resp.json()
-        access_token = token_data['access_token']
+    client = get_http_client()
+    # 1) code → token 교환
+    token_resp = await client.post(
+        'https://oauth2.googleapis.com/token',
+        data={
+            'code': code,
+            'client_id': GOOGLE_CLIENT_ID,
+            'client_secret': GOOGLE_CLIENT_SECRET,
+            'redirect_uri': redirect_uri,
+            'grant_type': 'authorization_code',
+        }
+    )
+    token_data = token_resp.json()
+    access_token = token_data['access_token']
 
-        # 2) access_token → 사용자 정보 조회
-        user_resp = await client.get(
-            'https://www.googleapis.com/oauth2/v2/userinfo',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-        return user_resp.json()
+    # 2) access_token → 사용자 정보 조회
+    user_resp = await client.get(
+        'https://www.googleapis.com/oauth2/v2/userinfo',
+        headers={'Authorization': f'Bearer {access_token}'}
+    )
+    return user_resp.json()
 
 
 async def get_or_create_user(google_user: dict, db_pool) -> dict:
@@ -1,16 +1,47 @@
 """
 주식 데이터 관리 클래스 (한국/미국 공통) - asyncpg 기반 + Redis 캐싱
 """
-import json as _json
+import asyncio
+import bisect
+import functools
+import time
+import orjson
 from collections import OrderedDict
 from datetime import datetime, date as date_type, timedelta
 from typing import Literal, Optional
 
 
+def single_flight(method):
+    """
+    동일 인자 동시 호출 병합 데코레이터 (single-flight)
+    첫 호출만 실제로 실행하고, 진행 중에 들어온 같은 호출은 그 결과를 함께 대기
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(method(self, *args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 한 요청이 취소(클라이언트 연결 종료)돼도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+    return wrapper
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso_date(date_str: str) -> date_type:
+    """'YYYY-MM-DD' → datetime.date (순수 함수라 요청 간 결과 재사용)"""
+    return datetime.strptime(date_str, '%Y-%m-%d').date()
+
+
 class StockDataManager:
     """주식 데이터 관리 클래스 (asyncpg pool 기반 + Redis 캐싱)"""
 
     CACHE_TTL = 7200  # 2시간 (안전망, 실제로는 수집 스크립트가 패턴 삭제)
+    LOCAL_CACHE_TTL = 60      # 워커 로컬 캐시 (Redis 패턴 삭제가 반영되기까지 최대 지연)
+    LOCAL_CACHE_SIZE = 4096
+    VERSION_CHECK_INTERVAL = 60  # 데이터 버전(DB 최신 날짜) 재확인 주기 (초)
 
     def __init__(self, market: Literal['kr', 'us'], db_pool, redis=None):
         self.market = market
@@ -20,23 +51,63 @@ class StockDataManager:
         self.code_col = 'code' if market == 'kr' else 'ticker'
         # 프론트엔드 Korean key
         self._code_key = '종목코드' if market == 'kr' else '티커'
+        # 프로세스 내 LRU 캐시: key → (만료 시각, 결과)
+        self._local_cache: OrderedDict = OrderedDict()
+        # 종목 검색 인덱스 (원본 목록 객체가 바뀌면 재생성)
+        self._ticker_index: list[tuple] = []
+        self._ticker_index_src = None
+        # 영업일 목록 (오름차순 date) - get_available_dates 캐시 결과가 바뀔 때만 재생성
+        self._trading_dates_cache: list = []
+        self._trading_dates_src = None
+        # 데이터 버전 (DB 최신 영업일) - 바뀌면 새 데이터가 적재된 것이므로 로컬 캐시 전체 무효화
+        self._data_version: Optional[str] = None
+        self._version_expires_at = 0.0
+        # single-flight 진행 중 작업: (메서드명, 인자) → Task
+        self._inflight: dict = {}
+
+    def _local_get(self, key: str):
+        """프로세스 내 LRU 캐시 조회 (만료 시 삭제)"""
+        entry = self._local_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local_cache[key]
+            return None
+        self._local_cache.move_to_end(key)
+        return value
+
+    def _local_set(self, key: str, value):
+        """프로세스 내 LRU 캐시 저장 (최대 크기 초과 시 오래된 항목 제거)"""
+        self._local_cache[key] = (time.monotonic() + self.LOCAL_CACHE_TTL, value)
+        self._local_cache.move_to_end(key)
+        if len(self._local_cache) > self.LOCAL_CACHE_SIZE:
+            self._local_cache.popitem(last=False)
 
     async def _cache_get(self, key: str):
-        """Redis에서 캐시된 결과 조회"""
+        """로컬 LRU → Redis 순서로 캐시된 결과 조회"""
+        value = self._local_get(key)
+        if value is not None:
+            return value
         if not self.redis:
             return None
         try:
             data = await self.redis.get(key)
-            return _json.loads(data) if data else None
+            if not data:
+                return None
+            value = orjson.loads(data)
         except Exception:
             return None
+        self._local_set(key, value)
+        return value
 
     async def _cache_set(self, key: str, value):
-        """Redis에 결과 캐싱"""
+        """로컬 LRU + Redis에 결과 캐싱"""
+        self._local_set(key, value)
         if not self.redis:
             return
         try:
-            await self.redis.set(key, _json.dumps(value, ensure_ascii=False, default=str), ex=self.CACHE_TTL)
+            await self.redis.set(key, orjson.dumps(value, default=str), ex=self.CACHE_TTL)
         except Exception:
             pass
 
@@ -44,7 +115,7 @@ class StockDataManager:
 
     def _parse_date(self, date_str: str):
         """날짜 문자열 → datetime.date 객체 (asyncpg 파라미터용)"""
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
+        return _parse_iso_date(date_str)
 
     def _to_float(self, v) -> Optional[float]:
         if v is None:
@@ -123,10 +194,39 @@ class StockDataManager:
             return 'change_rate'
         return 'trading_value'
 
+    async def _get_data_version(self) -> Optional[str]:
+        """
+        데이터 버전 (DB 최신 영업일 문자열) - VERSION_CHECK_INTERVAL마다 DB에서 재확인
+        날짜 목록/종목 목록처럼 날짜 인자가 없는 캐시 키에 포함 → 새 영업일 적재 시 자동으로 새 키
+        """
+        if time.monotonic() < self._version_expires_at:
+            return self._data_version
+        return await self._refresh_data_version()
+
+    @single_flight
+    async def _refresh_data_version(self) -> Optional[str]:
+        """DB 최신 날짜 조회 (PK 인덱스로 끝에서 1건) - 바뀌었으면 로컬 캐시 전체 비움"""
+        async with self.pool.acquire() as conn:
+            latest = await conn.fetchval(f"SELECT max(date) FROM {self.table}")
+        latest = latest.isoformat() if latest else None
+        self._version_expires_at = time.monotonic() + self.VERSION_CHECK_INTERVAL
+        if latest != self._data_version:
+            if self._data_version is not None:
+                # 이전 데이터 기준 결과가 TTL 동안 남지 않도록 즉시 비움 (Redis는 버전이 든 새 키 사용)
+                self._local_cache.clear()
+            self._data_version = latest
+        return latest
+
     # --- 공개 API ---
 
+    @single_flight
     async def get_available_dates(self) -> dict:
         """사용 가능한 날짜 목록과 범위 정보를 반환합니다."""
+        cache_key = f"{self.market}:dates@{await self._get_data_version()}"
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
                 f"SELECT DISTINCT date FROM {self.table} ORDER BY date DESC"
@@ -143,14 +243,81 @@ class StockDataManager:
             }
         max_d = datetime.strptime(dates[0], '%Y-%m-%d')
         min_d = datetime.strptime(dates[-1], '%Y-%m-%d')
-        return {
+        result = {
             'dates': dates,
             'initial_year': max_d.year,
             'initial_month': max_d.month,
             'min_year': min_d.year,
             'max_year': max_d.year,
         }
+        await self._cache_set(cache_key, result)
+        return result
+
+    async def _trading_dates(self) -> list:
+        """영업일 목록 (오름차순 datetime.date) - 날짜 목록 캐시에서 메모이즈"""
+        available = await self.get_available_dates()
+        if self._trading_dates_src is not available:
+            self._trading_dates_cache = [
+                date_type.fromisoformat(d) for d in reversed(available['dates'])
+            ]
+            self._trading_dates_src = available
+        return self._trading_dates_cache
+
+    async def _recent_trading_dates(self, base_date, n: int,
+                                    inclusive: bool = True) -> list:
+        """base_date 이전(inclusive=True면 포함) 최근 n 영업일 (오름차순)"""
+        dates = await self._trading_dates()
+        if inclusive:
+            end = bisect.bisect_right(dates, base_date)
+        else:
+            end = bisect.bisect_left(dates, base_date)
+        return dates[max(0, end - n):end]
+
+    async def _snap_trading_date(self, date_str: str, forward: bool = False) -> str:
+        """
+        날짜를 영업일로 맞춤 (캐시 키 정규화) - 기본은 이전 영업일, forward=True면 다음 영업일
+        주말/휴일로 들어온 같은 조회가 같은 캐시 키를 쓰도록 함 (결과는 동일)
+        """
+        dates = await self._trading_dates()
+        d = self._parse_date(date_str)
+        if forward:
+            i = bisect.bisect_left(dates, d)
+            return dates[i].isoformat() if i < len(dates) else date_str
+        i = bisect.bisect_right(dates, d)
+        return dates[i - 1].isoformat() if i > 0 else date_str
+
+    async def get_trading_dates_between(self, start_date: str, end_date: str) -> list[str]:
+        """[start_date, end_date] 구간의 영업일 목록 (오름차순 문자열, 이분 탐색으로 구간만 잘라냄)"""
+        dates = await self._trading_dates()
+        lo = bisect.bisect_left(dates, self._parse_date(start_date))
+        hi = bisect.bisect_right(dates, self._parse_date(end_date))
+        return [d.isoformat() for d in dates[lo:hi]]
+
+    async def _fetch_day_buckets(self, date_obj, buckets: dict) -> dict:
+        """
+        특정 날짜의 카테고리별 top300을 UNION ALL 단일 쿼리로 조회 (카테고리마다 DB 왕복하지 않음)
+        buckets: {카테고리: (추가 WHERE 조건, 정렬 컬럼)} → {카테고리: [레코드, ...]}
+        """
+        cols = (f"date, {self.code_col}, name, open, high, low, close, volume, "
+                f"change_rate, trading_value, ma20, ma240")
+        parts = [
+            f"(SELECT {i} AS bucket, "
+            f"ROW_NUMBER() OVER (ORDER BY {sort_col} DESC NULLS LAST) AS rn, {cols} "
+            f"FROM {self.table} WHERE date = $1 {cond} "
+            f"ORDER BY {sort_col} DESC NULLS LAST LIMIT 300)"
+            for i, (cond, sort_col) in enumerate(buckets.values())
+        ]
+        query = " UNION ALL ".join(parts) + " ORDER BY bucket, rn"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, date_obj)
+
+        names = list(buckets)
+        result = {name: [] for name in names}
+        for r in rows:
+            result[names[r['bucket']]].append(self._make_record(r))
+        return result
 
+    @single_flight
     async def get_kr_day_data(self, date_str: str) -> dict:
         """한국주식: 특정 날짜의 데이터를 반환합니다."""
         cache_key = f"kr:day:{date_str}"
@@ -158,33 +325,14 @@ class StockDataManager:
         if cached is not None:
             return cached
 
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-        async with self.pool.acquire() as conn:
-            rows_tv = await conn.fetch(
-                """SELECT date, code, name, open, high, low, close, volume,
-                          change_rate, trading_value, ma20, ma240
-                   FROM kr_stock_daily
-                   WHERE date = $1 AND change_rate >= 3.0
-                   ORDER BY trading_value DESC NULLS LAST
-                   LIMIT 300""",
-                date_obj
-            )
-            rows_cr = await conn.fetch(
-                """SELECT date, code, name, open, high, low, close, volume,
-                          change_rate, trading_value, ma20, ma240
-                   FROM kr_stock_daily
-                   WHERE date = $1
-                   ORDER BY change_rate DESC NULLS LAST
-                   LIMIT 300""",
-                date_obj
-            )
-        result = {
-            'trading_value': [self._make_record(r) for r in rows_tv],
-            'change_rate':   [self._make_record(r) for r in rows_cr],
-        }
+        result = await self._fetch_day_buckets(self._parse_date(date_str), {
+            'trading_value': ('AND change_rate >= 3.0', 'trading_value'),
+            'change_rate':   ('', 'change_rate'),
+        })
         await self._cache_set(cache_key, result)
         return result
 
+    @single_flight
     async def get_us_day_data(self, date_str: str) -> dict:
         """미국주식: 특정 날짜의 가격대별 데이터를 반환합니다."""
         cache_key = f"us:day:{date_str}"
@@ -192,43 +340,21 @@ class StockDataManager:
         if cached is not None:
             return cached
 
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-        sel = ("SELECT date, ticker, name, open, high, low, close, volume, "
-               "change_rate, trading_value, ma20, ma240 "
-               "FROM us_stock_daily WHERE date = $1")
-        async with self.pool.acquire() as conn:
-            rows_hv = await conn.fetch(
-                f"{sel} AND close >= 10 AND change_rate >= 3.0"
-                " ORDER BY trading_value DESC NULLS LAST LIMIT 300", date_obj)
-            rows_hr = await conn.fetch(
-                f"{sel} AND close >= 10"
-                " ORDER BY change_rate DESC NULLS LAST LIMIT 300", date_obj)
-            rows_mv = await conn.fetch(
-                f"{sel} AND close >= 5 AND close < 10 AND change_rate >= 3.0"
-                " ORDER BY trading_value DESC NULLS LAST LIMIT 300", date_obj)
-            rows_mr = await conn.fetch(
-                f"{sel} AND close >= 5 AND close < 10"
-                " ORDER BY change_rate DESC NULLS LAST LIMIT 300", date_obj)
-            rows_lv = await conn.fetch(
-                f"{sel} AND close < 5 AND change_rate >= 3.0"
-                " ORDER BY trading_value DESC NULLS LAST LIMIT 300", date_obj)
-            rows_lr = await conn.fetch(
-                f"{sel} AND close < 5"
-                " ORDER BY change_rate DESC NULLS LAST LIMIT 300", date_obj)
-        result = {
-            'high_price_volume': [self._make_record(r) for r in rows_hv],
-            'high_price_rate':   [self._make_record(r) for r in rows_hr],
-            'mid_price_volume':  [self._make_record(r) for r in rows_mv],
-            'mid_price_rate':    [self._make_record(r) for r in rows_mr],
-            'low_price_volume':  [self._make_record(r) for r in rows_lv],
-            'low_price_rate':    [self._make_record(r) for r in rows_lr],
-        }
+        buckets = {}
+        for price in ('high_price', 'mid_price', 'low_price'):
+            price_filter = self._price_filter_sql(price)
+            buckets[f'{price}_volume'] = (f'{price_filter} AND change_rate >= 3.0', 'trading_value')
+            buckets[f'{price}_rate']   = (price_filter, 'change_rate')
+        result = await self._fetch_day_buckets(self._parse_date(date_str), buckets)
         await self._cache_set(cache_key, result)
         return result
 
     @staticmethod
-    def _aggregate_rows(rows: list, interval: str) -> list[dict]:
-        """일봉 데이터를 주봉/월봉으로 집계 + 집계 봉 기준 MA 재계산"""
+    def _aggregate_rows(rows: list, interval: str) -> list[tuple]:
+        """
+        일봉 데이터를 주봉/월봉으로 집계 + 집계 봉 기준 MA 재계산
+        반환: 일봉 조회와 같은 컬럼 순서의 튜플 (date, open, high, low, close, trading_value, ma20, ma240)
+        """
         buckets: OrderedDict = OrderedDict()
         for r in rows:
             d = r['date']
@@ -259,52 +385,65 @@ class StockDataManager:
                 b['close'] = r['close']
                 b['trading_value'] = (b['trading_value'] or 0) + (r['trading_value'] or 0)
 
-        result = list(buckets.values())
+        result = []
 
-        # 집계된 봉 기준으로 MA20/MA240 재계산
-        closes = [float(b['close']) for b in result]
-        for i, b in enumerate(result):
-            if i >= 19:
-                b['ma20'] = sum(closes[i - 19:i + 1]) / 20
-            else:
-                b['ma20'] = None
-            if i >= 239:
-                b['ma240'] = sum(closes[i - 239:i + 1]) / 240
-            else:
-                b['ma240'] = None
+        # 집계된 봉 기준으로 MA20/MA240 재계산 (이동 합계로 봉당 O(1))
+        closes = [float(b['close']) for b in buckets.values()]
+        sum20 = sum240 = 0.0
+        for i, b in enumerate(buckets.values()):
+            c = closes[i]
+            sum20 += c
+            sum240 += c
+            if i >= 20:
+                sum20 -= closes[i - 20]
+            if i >= 240:
+                sum240 -= closes[i - 240]
+            ma20  = sum20 / 20 if i >= 19 else None
+            ma240 = sum240 / 240 if i >= 239 else None
+            result.append((b['date'], b['open'], b['high'], b['low'], b['close'],
+                           b['trading_value'], ma20, ma240))
 
         return result
 
+    @single_flight
     async def get_stock_history(self, stock_code: str, days: int = 90,
                                 end_date: str = None,
                                 interval: str = 'daily') -> dict:
         """특정 종목의 과거 차트 데이터 반환 (DB 사전계산 MA 사용)"""
+        # 모든 키에 데이터 버전 포함 → 새 영업일 적재 시 자동으로 새 키
+        # (end_date 지정 조회도 표시 행이 end_date 이후까지 이어지므로 버전 필요)
+        version = await self._get_data_version()
+        cache_key = (f"{self.market}:history:{stock_code}:{days}:"
+                     f"{end_date or 'latest'}@{version}:{interval}")
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         empty = {
             'line': [], 'candle': [], 'volume': [],
             'change': {}, 'ma20': [], 'ma240': [], 'end_date': end_date
         }
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
-                f"SELECT date, open, high, low, close, trading_value, "
-                f"change_rate, ma20, ma240 "
+                f"SELECT date, open, high, low, close, trading_value, ma20, ma240 "
                 f"FROM {self.table} WHERE {self.code_col} = $1 ORDER BY date ASC",
                 stock_code
             )
         if not rows:
             return empty
 
-        all_rows = list(rows)
-
-        # 주봉/월봉 집계
+        # 주봉/월봉 집계 (결과 튜플은 위 SELECT와 같은 컬럼 순서)
         if interval in ('weekly', 'monthly'):
-            all_rows = self._aggregate_rows(all_rows, interval)
+            all_rows = self._aggregate_rows(rows, interval)
+        else:
+            all_rows = rows
 
-        # 표시 범위 결정
+        # 표시 범위 결정 (행의 0번 컬럼 = date)
         if end_date:
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
-            before = [r for r in all_rows if r['date'] <= end_dt]
-            start_dt = before[-days]['date'] if len(before) > days else all_rows[0]['date']
-            display = [r for r in all_rows if r['date'] >= start_dt]
+            end_dt = self._parse_date(end_date)
+            before = [r for r in all_rows if r[0] <= end_dt]
+            start_dt = before[-days][0] if len(before) > days else all_rows[0][0]
+            display = [r for r in all_rows if r[0] >= start_dt]
         else:
             display = all_rows[-days:] if len(all_rows) > days else all_rows
 
@@ -314,13 +453,14 @@ class StockDataManager:
         change_data: dict = {}
         prev_close = None
 
-        for row in display:
-            date_str = row['date'].strftime('%Y-%m-%d')
-            close  = float(row['close'])
-            open_p = float(row['open'])  if row['open']  is not None else 0.0
-            high_p = float(row['high'])  if row['high']  is not None else 0.0
-            low_p  = float(row['low'])   if row['low']   is not None else 0.0
-            tv     = float(row['trading_value']) if row['trading_value'] is not None else 0.0
+        # 행을 위치 기반으로 한 번에 언패킹 (컬럼명 조회 반복 제거)
+        for d, open_p, high_p, low_p, close, tv, ma20, ma240 in display:
+            date_str = d.isoformat()
+            close  = float(close)
+            open_p = float(open_p) if open_p is not None else 0.0
+            high_p = float(high_p) if high_p is not None else 0.0
+            low_p  = float(low_p)  if low_p  is not None else 0.0
+            tv     = float(tv)     if tv     is not None else 0.0
 
             is_suspended = (open_p == 0.0)
 
@@ -341,24 +481,26 @@ class StockDataManager:
                                else '#2196F380'))
             volume_data.append({'time': date_str, 'value': tv, 'color': vol_color})
 
-            if row['ma20'] is not None:
+            if ma20 is not None:
                 ma20_data.append({
                     'time': date_str,
-                    'value': round(float(row['ma20']), decimal_places)
+                    'value': round(float(ma20), decimal_places)
                 })
-            if row['ma240'] is not None:
+            if ma240 is not None:
                 ma240_data.append({
                     'time': date_str,
-                    'value': round(float(row['ma240']), decimal_places)
+                    'value': round(float(ma240), decimal_places)
                 })
 
             prev_close = close
 
-        return {
+        result = {
             'line': line_data, 'candle': candle_data, 'volume': volume_data,
             'change': change_data, 'ma20': ma20_data, 'ma240': ma240_data,
             'end_date': end_date
         }
+        await self._cache_set(cache_key, result)
+        return result
 
     async def get_stock_overview(self, stock_code: str) -> dict:
         """특정 종목의 기업개요를 반환합니다."""
@@ -448,40 +590,62 @@ class StockDataManager:
         return result
 
     async def search_stocks(self, query: str, limit: int = 50) -> list[dict]:
-        """종목 검색 (관련도순 정렬)"""
+        """종목 검색 (관련도순 정렬) - 캐시된 전체 종목 목록에서 메모리 검색"""
         if not query:
             return []
         q = query.strip().upper()
-        async with self.pool.acquire() as conn:
-            rows = await conn.fetch(
-                f"""SELECT DISTINCT {self.code_col} AS code, name
-                    FROM {self.table}
-                    WHERE UPPER({self.code_col}) LIKE $1 OR UPPER(name) LIKE $1
-                    ORDER BY
-                        CASE
-                            WHEN UPPER({self.code_col}) = $2          THEN 1
-                            WHEN UPPER({self.code_col}) LIKE $3        THEN 2
-                            WHEN UPPER(name)            LIKE $3        THEN 3
-                            ELSE 4
-                        END,
-                        {self.code_col}
-                    LIMIT $4""",
-                f'%{q}%', q, f'{q}%', limit
-            )
-        return [{'code': r['code'], 'name': r['name']} for r in rows]
+        index = await self._get_ticker_index()
 
+        # 관련도: 코드 일치 → 코드 접두 → 이름 접두 → 부분 일치 (같은 순위는 코드순)
+        ranked = []
+        for code_u, name_u, item in index:
+            if q not in code_u and q not in name_u:
+                continue
+            if code_u == q:
+                rank = 1
+            elif code_u.startswith(q):
+                rank = 2
+            elif name_u.startswith(q):
+                rank = 3
+            else:
+                rank = 4
+            ranked.append((rank, item))
+        ranked.sort(key=lambda x: x[0])  # stable sort → 코드순 유지
+        return [dict(item) for _, item in ranked[:limit]]
+
+    async def _get_ticker_index(self) -> list[tuple]:
+        """검색용 인덱스 [(코드 대문자, 이름 대문자, 항목)] - 종목 목록이 바뀔 때만 재생성"""
+        tickers = await self.get_all_tickers()
+        if self._ticker_index_src is not tickers:
+            self._ticker_index = [
+                ((t['code'] or '').upper(), (t['name'] or '').upper(), t)
+                for t in tickers
+            ]
+            self._ticker_index_src = tickers
+        return self._ticker_index
+
+    @single_flight
     async def get_all_tickers(self) -> list[dict]:
-        """전체 종목 목록 반환 (code + name)"""
+        """전체 종목 목록 반환 (code + name, 코드순)"""
+        cache_key = f"{self.market}:tickers@{await self._get_data_version()}"
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
                 f"SELECT DISTINCT {self.code_col} AS code, name "
                 f"FROM {self.table} ORDER BY {self.code_col}"
             )
-        return [{'code': r['code'], 'name': r['name']} for r in rows]
+        result = [{'code': r['code'], 'name': r['name']} for r in rows]
+        await self._cache_set(cache_key, result)
+        return result
 
+    @single_flight
     async def get_frequent_stocks(self, base_date: str, weeks: int,
                                   category: str) -> list[dict]:
         """기간별 빈출 종목 상위 100개 반환"""
+        base_date = await self._snap_trading_date(base_date)
         cache_key = f"{self.market}:frequent:{base_date}:{weeks}:{category}"
         cached = await self._cache_get(cache_key)
         if cached is not None:
@@ -493,25 +657,24 @@ class StockDataManager:
         sort_col     = self._sort_col_sql(category)
         rate_cond    = "AND change_rate >= 3.0" if sort_col == 'trading_value' else ""
 
+        biz_dates = await self._recent_trading_dates(base_date, business_days)
+
         query = f"""
         WITH business_days AS (
-            SELECT DISTINCT date FROM {self.table}
-            WHERE date <= $1::date
-            ORDER BY date DESC
-            LIMIT $2
-        ),
-        daily_ranked AS (
-            SELECT {self.code_col} AS code, name,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY date
-                       ORDER BY {sort_col} DESC NULLS LAST
-                   ) AS rn
-            FROM {self.table}
-            WHERE date IN (SELECT date FROM business_days)
-              {rate_cond} {price_filter}
+            SELECT unnest($1::date[]) AS date
         ),
         top300 AS (
-            SELECT code, name FROM daily_ranked WHERE rn <= 300
+            -- 영업일별 top-300만 부분 정렬 (전 기간 행 전체에 ROW_NUMBER 정렬하지 않음)
+            SELECT t.code, t.name
+            FROM business_days bd
+            CROSS JOIN LATERAL (
+                SELECT {self.code_col} AS code, name
+                FROM {self.table}
+                WHERE date = bd.date
+                  {rate_cond} {price_filter}
+                ORDER BY {sort_col} DESC NULLS LAST
+                LIMIT 300
+            ) t
         ),
         freq AS (
             SELECT code, name, COUNT(*) AS cnt FROM top300 GROUP BY code, name
@@ -537,7 +700,7 @@ class StockDataManager:
         LIMIT 100
         """
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query, base_date, business_days)
+            rows = await conn.fetch(query, biz_dates)
 
         result = []
         for rank, row in enumerate(rows, 1):
@@ -554,9 +717,11 @@ class StockDataManager:
         await self._cache_set(cache_key, result)
         return result
 
+    @single_flight
     async def get_pullback_stocks(self, base_date: str, days_ago: int,
                                   category: str) -> list[dict]:
         """n일 전 상위 300개 중 오늘 하락 마감한 종목 반환"""
+        base_date = await self._snap_trading_date(base_date)
         cache_key = f"{self.market}:pullback:{base_date}:{days_ago}:{category}"
         cached = await self._cache_get(cache_key)
         if cached is not None:
@@ -568,11 +733,12 @@ class StockDataManager:
         rate_cond    = "AND change_rate >= 3.0" if sort_col == 'trading_value' else ""
         order_sql    = f"{sort_col} DESC NULLS LAST"
 
+        biz_dates = await self._recent_trading_dates(base_date, days_ago + 2)
+
         # 단일 쿼리로 합침: CTE로 영업일 → 과거 top300 → 오늘 하락 필터
         query = f"""
         WITH biz_dates AS (
-            SELECT DISTINCT date FROM {self.table}
-            WHERE date <= $1::date ORDER BY date DESC LIMIT $2
+            SELECT unnest($1::date[]) AS date
         ),
         date_range AS (
             SELECT MIN(date) AS first_d, MAX(date) AS last_d FROM biz_dates
@@ -582,7 +748,7 @@ class StockDataManager:
             FROM biz_dates
         ),
         past_date AS (
-            SELECT date AS d FROM sorted_dates WHERE rn = $2 - 1
+            SELECT date AS d FROM sorted_dates WHERE rn = $2::int - 1
         ),
         past_top300 AS (
             SELECT {self.code_col} AS code FROM {self.table}
@@ -600,7 +766,7 @@ class StockDataManager:
         ORDER BY {order_sql}
         """
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query, base_date, days_ago + 2)
+            rows = await conn.fetch(query, biz_dates, days_ago + 2)
 
         if not rows:
             return []
@@ -622,10 +788,12 @@ class StockDataManager:
         await self._cache_set(cache_key, result)
         return result
 
+    @single_flight
     async def get_consecutive_rise_stocks(self, base_date: str,
                                           consecutive_days: int,
                                           category: str) -> list[dict]:
         """n일 연속 상승한 종목 반환 (첫 날은 top300 필터 적용, SQL 윈도우 함수 사용)"""
+        base_date = await self._snap_trading_date(base_date)
         cache_key = f"{self.market}:consecutive:{base_date}:{consecutive_days}:{category}"
         cached = await self._cache_get(cache_key)
         if cached is not None:
@@ -636,11 +804,12 @@ class StockDataManager:
         price_filter = self._price_filter_sql(category)
         rate_cond    = "AND change_rate >= 3.0" if sort_col == 'trading_value' else ""
 
-        # 단일 SQL: 영업일 구하기 → 첫날 top300 → N일 연속 상승 카운트
+        biz_dates = await self._recent_trading_dates(base_date, consecutive_days)
+
+        # 단일 SQL: 첫날 top300 → N일 연속 상승 카운트 (영업일은 메모리 목록에서)
         query = f"""
         WITH biz_dates AS (
-            SELECT DISTINCT date FROM {self.table}
-            WHERE date <= $1::date ORDER BY date DESC LIMIT $2
+            SELECT unnest($1::date[]) AS date
         ),
         first_date AS (
             SELECT MIN(date) AS d FROM biz_dates
@@ -679,7 +848,7 @@ class StockDataManager:
         ORDER BY {sort_col} DESC NULLS LAST
         """
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query, base_date, consecutive_days)
+            rows = await conn.fetch(query, biz_dates)
 
         result = []
         for rank, row in enumerate(rows, 1):
@@ -697,6 +866,7 @@ class StockDataManager:
         await self._cache_set(cache_key, result)
         return result
 
+    @single_flight
     async def get_52week_high_stocks(self, base_date: str,
                                      consolidation_days: int = 0,
                                      range_pct: float = 0.0,
@@ -713,20 +883,18 @@ class StockDataManager:
         price_filter = self._price_filter_sql(category)
         sort_col     = self._sort_col_sql(category)
 
-        # 1단계: 오늘 + 어제 데이터만 가져옴 (가벼움)
+        # 1단계: 오늘 + 어제 데이터만 가져옴 (가벼움, 전 영업일은 7일 이내만)
+        prev = await self._recent_trading_dates(base_date, 1, inclusive=False)
+        prev_date = prev[0] if prev and prev[0] >= base_date - timedelta(days=7) else None
         query_today = f"""
-        WITH prev_date AS (
-            SELECT MAX(date) AS d FROM {self.table}
-            WHERE date < $1::date AND date >= $1::date - INTERVAL '7 days'
-        )
         SELECT date, {self.code_col} AS code, name,
                close, change_rate, trading_value, ma240
         FROM {self.table}
-        WHERE (date = $1::date OR date = (SELECT d FROM prev_date))
+        WHERE (date = $1::date OR date = $2::date)
           AND change_rate IS NOT NULL
         """
         async with self.pool.acquire() as conn:
-            all_rows = await conn.fetch(query_today, base_date)
+            all_rows = await conn.fetch(query_today, base_date, prev_date)
 
         if not all_rows:
             return []
@@ -753,44 +921,35 @@ class StockDataManager:
         if not today_candidates:
             return []
 
-        # 2단계: 후보 종목의 1년 MAX(close) 조회 (오늘 제외)
+        # 2단계: 후보 종목의 1년 MAX(close)를 오늘/어제 기준 모두 한 번에 조회
+        #   year_high      : [오늘-1년, 오늘)   → 오늘 신고가 판정
+        #   prev_year_high : [어제-1년, 어제)   → 어제도 신고가였는지 판정 (어제 없으면 NULL)
         candidate_codes = [r['code'] for r in today_candidates]
+        yesterday_date = yesterday_rows[0]['date'] if yesterday_rows else None
         async with self.pool.acquire() as conn:
             max_rows = await conn.fetch(
-                f"SELECT {self.code_col} AS code, MAX(close) AS year_high "
+                f"SELECT {self.code_col} AS code, "
+                f"  MAX(close) FILTER (WHERE date >= $2::date - INTERVAL '1 year') AS year_high, "
+                f"  MAX(close) FILTER (WHERE date >= $3::date - INTERVAL '1 year' "
+                f"                       AND date < $3::date) AS prev_year_high "
                 f"FROM {self.table} "
                 f"WHERE {self.code_col} = ANY($1) "
-                f"  AND date >= $2::date - INTERVAL '1 year' "
+                f"  AND date >= COALESCE($3::date, $2::date) - INTERVAL '1 year' "
                 f"  AND date < $2::date "
                 f"GROUP BY {self.code_col}",
-                candidate_codes, base_date
+                candidate_codes, base_date, yesterday_date
             )
-        year_high_map = {r['code']: float(r['year_high']) for r in max_rows}
+        year_high_map = {r['code']: float(r['year_high'])
+                         for r in max_rows if r['year_high'] is not None}
+        y_high_map = {r['code']: float(r['prev_year_high'])
+                      for r in max_rows if r['prev_year_high'] is not None}
 
         # 어제도 신고가였던 종목 제외
         yesterday_codes = set()
-        if yesterday_rows:
-            yesterday_code_set = {r['code'] for r in yesterday_rows}
-            # 어제 종목의 1년 MAX(close) (어제 제외)
-            yesterday_date = yesterday_rows[0]['date']
-            yesterday_candidates = [r['code'] for r in yesterday_rows
-                                    if r['code'] in set(candidate_codes)]
-            if yesterday_candidates:
-                async with self.pool.acquire() as conn:
-                    ymax_rows = await conn.fetch(
-                        f"SELECT {self.code_col} AS code, MAX(close) AS year_high "
-                        f"FROM {self.table} "
-                        f"WHERE {self.code_col} = ANY($1) "
-                        f"  AND date >= $2::date - INTERVAL '1 year' "
-                        f"  AND date < $2::date "
-                        f"GROUP BY {self.code_col}",
-                        yesterday_candidates, yesterday_date
-                    )
-                y_high_map = {r['code']: float(r['year_high']) for r in ymax_rows}
-                for r in yesterday_rows:
-                    if r['code'] in y_high_map:
-                        if float(r['close']) >= y_high_map[r['code']]:
-                            yesterday_codes.add(r['code'])
+        for r in yesterday_rows:
+            yh = y_high_map.get(r['code'])
+            if yh is not None and float(r['close']) >= yh:
+                yesterday_codes.add(r['code'])
 
         # 최종 필터: 오늘 종가 >= 1년 최고가 AND 어제는 아님
         rows = []
@@ -808,15 +967,10 @@ class StockDataManager:
         # 횡보 필터 (Python)
         if consolidation_days > 0 and range_pct > 0:
             filter_codes = [r['code'] for r in rows]
-            async with self.pool.acquire() as conn:
-                biz_rows = await conn.fetch(
-                    f"SELECT DISTINCT date FROM {self.table} "
-                    f"WHERE date < $1::date ORDER BY date DESC LIMIT $2",
-                    base_date, consolidation_days
-                )
-            if len(biz_rows) >= 2:
-                w_start = min(r['date'] for r in biz_rows)
-                w_end   = max(r['date'] for r in biz_rows)
+            window = await self._recent_trading_dates(
+                base_date, consolidation_days, inclusive=False)
+            if len(window) >= 2:
+                w_start, w_end = window[0], window[-1]
                 async with self.pool.acquire() as conn:
                     win_rows = await conn.fetch(
                         f"SELECT {self.code_col} AS code, "
@@ -854,6 +1008,7 @@ class StockDataManager:
         await self._cache_set(cache_key, result)
         return result
 
+    @single_flight
     async def get_gap_analysis(
         self,
         start_date: str,
@@ -872,17 +1027,32 @@ class StockDataManager:
         direction: str = 'up'
     ) -> list[dict]:
         """갭 상승/하락 분석 (3단계 필터)"""
+        start_date = await self._snap_trading_date(start_date, forward=True)
+        end_date   = await self._snap_trading_date(end_date)
+        cache_key = f"{self.market}:gap@{await self._get_data_version()}:" + ':'.join(map(str, (
+            start_date, end_date, base_price, compare_price, min_rate, max_rate,
+            extra_base, extra_compare, extra_direction,
+            detail_base, detail_compare, detail_direction,
+            ticker_filter, direction,
+        )))
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         start_date = self._parse_date(start_date)
         end_date   = self._parse_date(end_date)
         params = [start_date, end_date]
         ticker_cond = ""
         if ticker_filter:
-            params.append(f'%{ticker_filter.upper()}%')
-            n = len(params)
-            ticker_cond = (
-                f"AND (UPPER({self.code_col}) LIKE ${n} "
-                f"OR UPPER(name) LIKE ${n})"
-            )
+            # 부분 일치는 캐시된 종목 인덱스에서 먼저 해석 → DB에는 코드 목록만 전달 (행별 UPPER/LIKE 제거)
+            q = ticker_filter.upper()
+            codes = [item['code'] for code_u, name_u, item in await self._get_ticker_index()
+                     if q in code_u or q in name_u]
+            if not codes:
+                await self._cache_set(cache_key, [])
+                return []
+            params.append(list(dict.fromkeys(codes)))
+            ticker_cond = f"AND {self.code_col} = ANY(${len(params)})"
 
         query = f"""
         WITH windowed AS (
@@ -927,57 +1097,64 @@ class StockDataManager:
         base_col    = col_map.get(base_price,    'prev_close')
         compare_col = col_map.get(compare_price, 'open')
 
-        result = []
-        for row in rows:
-            d = dict(row)
+        # 행마다 반복하던 조건 해석을 루프 밖에서 한 번만
+        if direction == 'down':
+            eff_max = max_rate if max_rate < 99999 else float('inf')
+            rate_lo, rate_hi = -eff_max, -min_rate
+        else:
+            rate_lo, rate_hi = min_rate, max_rate
+        extra = ((col_map.get(extra_base, extra_base),
+                  col_map.get(extra_compare, extra_compare), extra_direction)
+                 if extra_base and extra_compare and extra_direction else None)
+        detail = ((col_map.get(detail_base, detail_base),
+                   col_map.get(detail_compare, detail_compare), detail_direction)
+                  if detail_base and detail_compare and detail_direction else None)
 
-            base_val    = self._to_float(d.get(base_col))
-            compare_val = self._to_float(d.get(compare_col))
+        result = []
+        for row in rows:  # asyncpg Record를 그대로 조회 (행별 dict 복사 없음)
+            base_val    = self._to_float(row.get(base_col))
+            compare_val = self._to_float(row.get(compare_col))
             if base_val is None or compare_val is None or base_val == 0:
                 continue
 
             gap_rate = (compare_val - base_val) / base_val * 100
 
             # 1단계: 방향 + 범위
-            if direction == 'down':
-                eff_max = max_rate if max_rate < 99999 else float('inf')
-                if not (-eff_max <= gap_rate <= -min_rate):
-                    continue
-            else:
-                if not (min_rate <= gap_rate <= max_rate):
-                    continue
+            if not (rate_lo <= gap_rate <= rate_hi):
+                continue
 
             # 2단계: 추가 조건
-            if extra_base and extra_compare and extra_direction:
-                eb = self._to_float(d.get(col_map.get(extra_base, extra_base)))
-                ec = self._to_float(d.get(col_map.get(extra_compare, extra_compare)))
+            if extra:
+                eb = self._to_float(row.get(extra[0]))
+                ec = self._to_float(row.get(extra[1]))
                 if eb is not None and ec is not None and eb != 0:
                     er = (ec - eb) / eb * 100
-                    if extra_direction == 'up'   and er <= 0: continue
-                    if extra_direction == 'down' and er >= 0: continue
+                    if extra[2] == 'up'   and er <= 0: continue
+                    if extra[2] == 'down' and er >= 0: continue
 
             # 3단계: 세부 조건
-            if detail_base and detail_compare and detail_direction:
-                db_ = self._to_float(d.get(col_map.get(detail_base, detail_base)))
-                dc_ = self._to_float(d.get(col_map.get(detail_compare, detail_compare)))
+            if detail:
+                db_ = self._to_float(row.get(detail[0]))
+                dc_ = self._to_float(row.get(detail[1]))
                 if db_ is not None and dc_ is not None and db_ != 0:
                     dr = (dc_ - db_) / db_ * 100
-                    if detail_direction == 'up'   and dr <= 0: continue
-                    if detail_direction == 'down' and dr >= 0: continue
+                    if detail[2] == 'up'   and dr <= 0: continue
+                    if detail[2] == 'down' and dr >= 0: continue
 
-            close  = float(d['close'])
-            ma240  = self._to_float(d.get('ma240'))
+            close  = float(row['close'])
+            ma240  = self._to_float(row['ma240'])
             result.append({
-                '날짜':          d['date'].strftime('%Y-%m-%d'),
-                '티커':          d['code'],
-                '종목명':        d['name'],
+                '날짜':          row['date'].strftime('%Y-%m-%d'),
+                '티커':          row['code'],
+                '종목명':        row['name'],
                 '종가':          round(close, 2),
                 '등락률':        round(gap_rate, 2),
-                '거래대금':      int(d['trading_value'] or 0),
+                '거래대금':      int(row['trading_value'] or 0),
                 'ma240':         round(ma240, 2) if ma240 is not None else None,
                 'ma240_position': self._ma240_pos(close, ma240),
-                'is_52week_high': bool(d.get('is_52week_high', False)),
+                'is_52week_high': bool(row['is_52week_high']),
             })
+        await self._cache_set(cache_key, result)
         return result
 
     async def get_new_listings(self, start_date: str, end_date: str) -> list[dict]:
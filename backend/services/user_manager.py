@@ -1,74 +1,338 @@
 """
 사용자 데이터 관리 클래스 (사용자 ID별 폴더/즐겨찾기/메모)
 """
-import json
+import asyncio
+import atexit
+import functools
+import hashlib
+import itertools
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
+try:
+    import fcntl  # POSIX 전용 (Windows 로컬 개발에서는 데이터 폴더 점유 확인 생략)
+except ImportError:
+    fcntl = None
+
+
+@functools.lru_cache(maxsize=2)
+def _format_ts(ts_sec: int, fmt: str) -> str:
+    """초 단위 타임스탬프 → 로컬 시각 문자열 (같은 초 안의 반복 호출은 strftime 생략)"""
+    return datetime.fromtimestamp(ts_sec).strftime(fmt)
+
+
+def _today() -> str:
+    return _format_ts(int(time.time()), '%Y-%m-%d')
+
+
+def _now_str() -> str:
+    return _format_ts(int(time.time()), '%Y-%m-%d %H:%M:%S')
+
 
 class UserManager:
     """사용자 데이터 관리 클래스"""
 
-    def __init__(self, data_dir: str):
+    WRITE_DELAY = 0.1  # 쓰기 지연 (초) - 이 시간 안의 연속 변경은 한 번의 파일 쓰기로 합침
+
+    def __init__(self, data_dir: str, max_cache: int = 1024, pretty: bool = False):
         self.data_dir = Path(data_dir)
+        # pretty=True면 사람이 읽기 쉬운 2칸 들여쓰기, 기본은 공백 없는 compact JSON (쓰기/읽기 빠르고 파일 작음)
+        self._dump_option = orjson.OPT_INDENT_2 if pretty else 0
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.cache = {}
+        # 사용자 데이터 LRU 캐시 (최대 max_cache명, 초과 시 가장 오래 안 쓴 사용자 제거)
+        self.cache: OrderedDict = OrderedDict()
+        self.max_cache = max_cache
+        # 임시 파일명 일련번호 (writer 스레드와 LRU 제거 시 동기 쓰기가 겹쳐도 구분)
+        self._tmp_seq = itertools.count(1)
+        # 사용자별 마지막으로 기록한 내용 해시 (내용이 같으면 파일 쓰기 생략)
+        self._last_hash: dict[str, bytes] = {}
+        # 사용자별 파일 경로 캐시 (해시/경로 조합 반복 방지)
+        self._path_cache: dict[str, Path] = {}
+        # write-behind: 변경된 사용자 ID 모음 + 백그라운드 writer 깨우기용 이벤트
+        self._dirty: set = set()
+        # LRU에서 제거됐지만 아직 파일에 기록 안 된 사용자 → 제거 시점 직렬화 내용 (writer가 기록, load는 파일 대신 이걸 읽음)
+        self._evicted: dict[str, bytes] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._stopping = False
+        # writer 스레드가 지금 파일을 쓰고 있는 사용자 (LRU 제거 시 동기 쓰기와 겹치지 않도록 제거 대상에서 제외)
+        self._writing: set = set()
+        # 데이터 폴더 점유 잠금 파일 (claim_data_dir)
+        self._lock_file = None
+        # lifespan 종료 없이 프로세스가 끝나는 경우 대비 (정상 종료 시에는 stop_writer가 이미 비워둠)
+        atexit.register(self.flush)
+        self._migrate_flat_layout()
+
+    def claim_data_dir(self) -> bool:
+        """
+        데이터 폴더를 이 프로세스가 단독으로 쓰는지 확인 (lifespan 시작 시 호출)
+        사용자 캐시/지연 쓰기가 프로세스별이라 여러 워커가 같은 폴더를 쓰면 서로의 저장을 덮어씀
+        잠금은 프로세스 종료 시 자동 해제. 다른 프로세스가 이미 점유 중이면 False
+        """
+        if fcntl is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.data_dir / '.lock', 'wb')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
 
     def _get_file_path(self, user_id: str) -> Path:
-        """사용자 ID별 데이터 파일 경로"""
-        return self.data_dir / f'user_{user_id}.json'
+        """사용자 ID별 데이터 파일 경로 (캐시 - LRU에서 사용자 제거 시 함께 삭제)"""
+        path = self._path_cache.get(user_id)
+        if path is None:
+            path = self._path_cache[user_id] = self._shard_path(user_id)
+        return path
+
+    def _shard_path(self, user_id: str) -> Path:
+        """ID 해시 2자리 하위 폴더로 분산한 파일 경로 (한 폴더에 파일이 몰리지 않게)"""
+        shard = hashlib.blake2b(user_id.encode(), digest_size=1).hexdigest()
+        return self.data_dir / shard / f'user_{user_id}.json'
+
+    def _migrate_flat_layout(self):
+        """구버전 평면 구조(data_dir/user_*.json) 파일을 하위 폴더 구조로 이동 (1회성)"""
+        for old_path in self.data_dir.glob('user_*.json'):
+            user_id = old_path.stem[len('user_'):]
+            new_path = self._shard_path(user_id)
+            try:
+                new_path.parent.mkdir(exist_ok=True)
+                os.replace(old_path, new_path)
+            except FileNotFoundError:
+                pass  # 다른 워커가 먼저 이동
+            except OSError as e:
+                print(f"데이터 파일 이동 실패 ({old_path.name}): {e}")
 
     def _get_default_data(self) -> dict:
         """기본 데이터 구조"""
         return {
             'folders': [{'id': 'default', 'name': '기본 폴더'}],
-            'favorites': {'default': []},
-            'memos': {}
+            'favorites': {'default': {}},
+            'memos': {},
+            'folder_seq': 0  # 폴더 ID 일련번호 (파일에 저장 - 재시작 후에도 이어짐)
         }
 
     def load(self, user_id: str) -> dict:
         """사용자 데이터 로드"""
         if user_id in self.cache:
+            self.cache.move_to_end(user_id)
             return self.cache[user_id]
 
-        file_path = self._get_file_path(user_id)
-        if file_path.exists():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                # 구버전 데이터 마이그레이션
-                if 'folders' not in data:
-                    old_favorites = data.get('favorites', [])
-                    data = self._get_default_data()
-                    data['favorites']['default'] = old_favorites if isinstance(old_favorites, list) else []
-                self.cache[user_id] = data
-                return data
-            except Exception as e:
-                print(f"데이터 로드 실패 (user {user_id}): {e}")
-
-        data = self._get_default_data()
-        self.cache[user_id] = data
+        # 존재 여부를 따로 확인하지 않고 바로 읽음 (파일 없음 = 신규 사용자)
+        try:
+            raw = self._evicted.get(user_id)  # 제거됐지만 아직 기록 전이면 파일보다 최신
+            data = self._migrate(orjson.loads(raw if raw is not None else self._get_file_path(user_id).read_bytes()))
+            self._build_indexes(data)  # folders 항목 구조 오류도 여기서 걸러냄
+        except FileNotFoundError:
+            data = None
+        except (OSError, orjson.JSONDecodeError) as e:
+            print(f"데이터 로드 실패 (user {user_id}): {e}")
+            data = None
+        except (TypeError, KeyError, AttributeError) as e:
+            # JSON으로는 읽히지만 구조가 다른 파일 (null, 리스트, favorites가 dict가 아님 등)
+            print(f"데이터 형식 오류 (user {user_id}): {e!r}")
+            data = None
+        if data is None:
+            data = self._get_default_data()
+            self._build_indexes(data)
+        self._cache_put(user_id, data)
         return data
 
+    def _migrate(self, data: dict) -> dict:
+        """구버전 형식 데이터를 현재 형식으로 변환 (구조가 맞지 않으면 TypeError/KeyError/AttributeError)"""
+        # 구버전 데이터 마이그레이션
+        if 'folders' not in data:
+            old_favorites = data.get('favorites', [])
+            data = self._get_default_data()
+            data['favorites']['default'] = old_favorites if isinstance(old_favorites, list) else []
+        # 리스트 형식 즐겨찾기 → 'market_code' 키 dict 형식 (dict 삽입 순서 = 표시 순서)
+        for folder_id, favs in data['favorites'].items():
+            if isinstance(favs, list):
+                data['favorites'][folder_id] = {
+                    self._fav_key(f['code'], f.get('market', 'kr')): f for f in favs
+                }
+        # 'market_code' 키 메모 → {market: {code: 메모}} 형식
+        data['memos'] = self._migrate_memos(data.get('memos', {}))
+        return data
+
+    def _build_indexes(self, data: dict):
+        """
+        메모리 전용 보조 인덱스 생성 ('_'로 시작하는 키는 파일에 저장하지 않음)
+        _index: 'market_code' → 해당 종목이 들어있는 폴더 ID 목록
+        _folder_by_id: 폴더 ID → 폴더 dict (data['folders']와 같은 객체)
+        """
+        index: dict = {}
+        for folder_id, favs in data['favorites'].items():
+            for key in favs:
+                index.setdefault(key, []).append(folder_id)
+        data['_index'] = index
+        data['_folder_by_id'] = {f['id']: f for f in data['folders']}
+
+    @staticmethod
+    def _order_index(keys: list) -> dict:
+        """순서 변경 요청 → {키: 위치} (중복 키는 첫 위치)"""
+        order_index: dict = {}
+        for i, key in enumerate(keys):
+            order_index.setdefault(key, i)
+        return order_index
+
+    @staticmethod
+    def _index_add(data: dict, key: str, folder_id: str):
+        folder_ids = data['_index'].setdefault(key, [])
+        if folder_id not in folder_ids:
+            folder_ids.append(folder_id)
+
+    @staticmethod
+    def _index_remove(data: dict, key: str, folder_id: str):
+        folder_ids = data['_index'].get(key)
+        if folder_ids and folder_id in folder_ids:
+            folder_ids.remove(folder_id)
+            if not folder_ids:
+                del data['_index'][key]
+
+    @staticmethod
+    def _fav_key(stock_code: str, market: str) -> str:
+        """즐겨찾기 키 ('market_code')"""
+        return f"{market}_{stock_code}"
+
+    @staticmethod
+    def _migrate_memos(memos: dict) -> dict:
+        """평면 메모 {'market_code': 메모} → {market: {code: 메모}} (이미 변환된 항목은 그대로)"""
+        nested: dict = {}
+        for key, value in memos.items():
+            if isinstance(value.get('content'), str):  # 평면 형식 (메모 본문이 바로 있음)
+                market, code = key.split('_', 1) if '_' in key else ('kr', key)
+                nested.setdefault(market, {})[code] = value
+            else:
+                nested.setdefault(key, {}).update(value)
+        return nested
+
+    def _cache_put(self, user_id: str, data: dict):
+        """캐시에 추가 + 최대 크기 초과 시 LRU 제거 (저장 대기 중인 사용자는 직렬화해서 writer에 넘김 - 요청 처리 중 파일 I/O 없음)"""
+        self.cache[user_id] = data
+        while len(self.cache) > self.max_cache:
+            old_id = next((uid for uid in self.cache if uid not in self._writing), user_id)
+            if old_id == user_id:
+                break  # 나머지는 모두 쓰기 진행 중 → 잠시 한도 초과 허용
+            if old_id in self._dirty:
+                self._dirty.discard(old_id)
+                self._evicted[old_id] = self._serialize(old_id)
+                self._wakeup.set()
+            del self.cache[old_id]
+            if old_id not in self._evicted:  # 기록 대기 중이면 writer가 기록 후 정리
+                self._last_hash.pop(old_id, None)
+                self._path_cache.pop(old_id, None)
+
     def save(self, user_id: str):
-        """사용자 데이터 저장"""
+        """사용자 데이터 저장 요청 (writer 실행 중이면 백그라운드로 지연 저장, 아니면 즉시 저장)"""
         if user_id not in self.cache:
             return
+        if self._wakeup is None:
+            self._write_file(user_id, self._serialize(user_id))
+            return
+        self._dirty.add(user_id)
+        self._wakeup.set()
+
+    def _serialize(self, user_id: str) -> bytes:
+        """캐시된 사용자 데이터를 JSON(UTF-8 bytes)으로 변환 (orjson, '_' 보조 키 제외)"""
+        data = {k: v for k, v in self.cache[user_id].items() if not k.startswith('_')}
+        return orjson.dumps(data, option=self._dump_option)
+
+    def _write_file(self, user_id: str, payload: bytes):
+        """사용자 데이터 파일 쓰기 (블로킹 I/O) - 임시 파일에 쓴 뒤 교체 (쓰기 중 중단돼도 기존 파일 보존)"""
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
+        if self._last_hash.get(user_id) == digest:
+            return  # 마지막 기록과 내용 동일 (이름/순서를 같은 값으로 다시 보낸 경우 등)
+        file_path = self._get_file_path(user_id)
+        # 임시 파일명은 프로세스/쓰기마다 고유 (같은 파일을 동시에 쓰는 쪽과 임시 파일이 겹치지 않도록)
+        tmp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.{next(self._tmp_seq)}.tmp')
         try:
-            file_path = self._get_file_path(user_id)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.cache[user_id], f, ensure_ascii=False, indent=2)
+            file_path.parent.mkdir(exist_ok=True)
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, file_path)
+            self._last_hash[user_id] = digest
         except Exception as e:
             print(f"데이터 저장 실패 (user {user_id}): {e}")
+            tmp_path.unlink(missing_ok=True)  # 교체 실패 시 남은 임시 파일 정리
+
+    async def _writer_loop(self):
+        """변경된 사용자 파일을 모아서 스레드풀에서 기록 (이벤트 루프 블로킹 방지)"""
+        while not self._stopping:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.WRITE_DELAY)
+            self._wakeup.clear()
+            # 한 명씩 꺼내서 기록 (대기 중인 사용자는 _dirty에 남아 있어야 LRU 제거 시 writer로 넘어감)
+            while self._evicted or self._dirty:
+                if self._evicted:
+                    # 기록이 끝날 때까지 _evicted에 남겨둠 (그 사이 load되면 이 내용을 읽음)
+                    user_id = next(iter(self._evicted))
+                    payload = self._evicted[user_id]
+                else:
+                    user_id = self._dirty.pop()
+                    # 직렬화는 루프에서 (변경과 경합 없는 스냅샷), 파일 쓰기만 스레드로
+                    payload = self._serialize(user_id)
+                self._writing.add(user_id)
+                try:
+                    await asyncio.to_thread(self._write_file, user_id, payload)
+                finally:
+                    self._writing.discard(user_id)
+                    self._finish_evicted(user_id, payload)
+
+    def _finish_evicted(self, user_id: str, payload: bytes):
+        """제거된 사용자 기록 완료 처리 (기록한 내용이 최신이면 대기 목록에서 빼고, 캐시에 없으면 보조 정보도 정리)"""
+        if self._evicted.get(user_id) is payload:
+            del self._evicted[user_id]
+        if user_id not in self.cache and user_id not in self._evicted:
+            self._last_hash.pop(user_id, None)
+            self._path_cache.pop(user_id, None)
+
+    def start_writer(self):
+        """백그라운드 writer 시작 (lifespan에서 호출)"""
+        if self._writer_task is None:
+            self._wakeup = asyncio.Event()
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def stop_writer(self):
+        """백그라운드 writer 종료 + 남은 변경 즉시 저장 (lifespan 종료 시 호출)"""
+        if self._writer_task is not None:
+            # cancel하지 않고 현재 배치까지 마치게 함 (스레드에서 진행 중인 쓰기와 flush가 같은 파일에 겹치지 않도록)
+            self._stopping = True
+            self._wakeup.set()
+            await self._writer_task
+            self._writer_task = None
+            self._wakeup = None
+            self._stopping = False
+        self.flush()
+
+    def flush(self):
+        """대기 중인 변경 사항 동기 저장"""
+        evicted, self._evicted = self._evicted, {}
+        for user_id, payload in evicted.items():
+            self._write_file(user_id, payload)
+            self._finish_evicted(user_id, payload)
+        dirty, self._dirty = self._dirty, set()
+        for user_id in dirty:
+            if user_id in self.cache:
+                self._write_file(user_id, self._serialize(user_id))
 
     # --- 폴더 관리 ---
     def create_folder(self, user_id: str, folder_name: str) -> dict:
         """폴더 생성"""
         data = self.load(user_id)
-        folder_id = f'folder_{int(datetime.now().timestamp() * 1000)}'
+        # 사용자별 일련번호 (같은 밀리초에 생성돼도 구분, 구버전 데이터는 0부터)
+        data['folder_seq'] = seq = data.get('folder_seq', 0) + 1
+        folder_id = f'folder_{time.time_ns() // 1_000_000}_{seq}'
         new_folder = {'id': folder_id, 'name': folder_name}
         data['folders'].append(new_folder)
-        data['favorites'][folder_id] = []
+        data['_folder_by_id'][folder_id] = new_folder
+        data['favorites'][folder_id] = {}
         self.save(user_id)
         return new_folder
 
@@ -77,35 +341,31 @@ class UserManager:
         if folder_id == 'default':
             return False
         data = self.load(user_id)
-        data['folders'] = [f for f in data['folders'] if f['id'] != folder_id]
-        if folder_id in data['favorites']:
-            del data['favorites'][folder_id]
+        if data['_folder_by_id'].pop(folder_id, None) is not None:
+            data['folders'] = [f for f in data['folders'] if f['id'] != folder_id]
+        for key in data['favorites'].pop(folder_id, ()):
+            self._index_remove(data, key, folder_id)
         self.save(user_id)
         return True
 
     def rename_folder(self, user_id: str, folder_id: str, new_name: str) -> bool:
         """폴더 이름 변경"""
         data = self.load(user_id)
-        for folder in data['folders']:
-            if folder['id'] == folder_id:
-                folder['name'] = new_name
-                self.save(user_id)
-                return True
-        return False
+        folder = data['_folder_by_id'].get(folder_id)
+        if folder is None:
+            return False
+        if folder['name'] != new_name:
+            folder['name'] = new_name
+            self.save(user_id)
+        return True
 
     def reorder_folders(self, user_id: str, folder_ids: list) -> bool:
         """폴더 순서 변경"""
         data = self.load(user_id)
-        folder_map = {f['id']: f for f in data['folders']}
-        new_folders = []
-        for fid in folder_ids:
-            if fid in folder_map:
-                new_folders.append(folder_map[fid])
-        # 혹시 누락된 폴더가 있으면 추가
-        for folder in data['folders']:
-            if folder['id'] not in folder_ids:
-                new_folders.append(folder)
-        data['folders'] = new_folders
+        # 제자리 안정 정렬: 요청 순서대로, 누락된 폴더는 기존 순서 그대로 뒤에
+        order_index = self._order_index(folder_ids)
+        missing = len(order_index)
+        data['folders'].sort(key=lambda f: order_index.get(f['id'], missing))
         self.save(user_id)
         return True
 
@@ -114,152 +374,182 @@ class UserManager:
         data = self.load(user_id)
         result = []
         for folder in data['folders']:
-            count = len(data['favorites'].get(folder['id'], []))
+            count = len(data['favorites'].get(folder['id'], {}))
             result.append({**folder, 'count': count})
         return result
 
     # --- 즐겨찾기 관리 ---
-    def add_favorite(self, user_id: str, folder_id: str, stock_code: str, stock_name: str, market: str = 'kr') -> bool:
-        """폴더에 즐겨찾기 추가"""
-        data = self.load(user_id)
-        if folder_id not in data['favorites']:
-            data['favorites'][folder_id] = []
-        # 이미 해당 폴더에 존재하는지 확인
-        for fav in data['favorites'][folder_id]:
-            if fav['code'] == stock_code and fav.get('market', 'kr') == market:
-                return False
-        data['favorites'][folder_id].append({
+    # 폴더별 즐겨찾기: {'market_code': 항목} (조회/추가/삭제 O(1), API는 순서대로 리스트 반환)
+    def _insert_favorite(self, data: dict, folder_id: str, stock_code: str, stock_name: str, market: str) -> bool:
+        """즐겨찾기 추가 (저장 없음) - 이미 해당 폴더에 있으면 False"""
+        favs = data['favorites'].setdefault(folder_id, {})
+        key = self._fav_key(stock_code, market)
+        if key in favs:
+            return False
+        favs[key] = {
             'code': stock_code,
             'name': stock_name,
             'market': market,
-            'added_date': datetime.now().strftime('%Y-%m-%d')
-        })
+            'added_date': _today()
+        }
+        self._index_add(data, key, folder_id)
+        return True
+
+    def _delete_favorite(self, data: dict, folder_id: str, stock_code: str, market: str) -> bool:
+        """즐겨찾기 제거 (저장 없음) - 없으면 False"""
+        favs = data['favorites'].get(folder_id)
+        key = self._fav_key(stock_code, market)
+        if favs is None or favs.pop(key, None) is None:
+            return False
+        self._index_remove(data, key, folder_id)
+        return True
+
+    def add_favorite(self, user_id: str, folder_id: str, stock_code: str, stock_name: str, market: str = 'kr') -> bool:
+        """폴더에 즐겨찾기 추가"""
+        data = self.load(user_id)
+        if not self._insert_favorite(data, folder_id, stock_code, stock_name, market):
+            return False
         self.save(user_id)
         return True
 
+    def add_favorites(self, user_id: str, items: list[dict]) -> int:
+        """즐겨찾기 일괄 추가 (저장 1회) - items: [{'folder_id', 'code', 'name', 'market'}], 추가된 개수 반환"""
+        data = self.load(user_id)
+        added = sum(
+            self._insert_favorite(data, item['folder_id'], item['code'], item['name'], item.get('market', 'kr'))
+            for item in items
+        )
+        if added:
+            self.save(user_id)
+        return added
+
     def remove_favorite(self, user_id: str, folder_id: str, stock_code: str, market: str = 'kr') -> bool:
         """폴더에서 즐겨찾기 제거"""
         data = self.load(user_id)
-        if folder_id not in data['favorites']:
+        if not self._delete_favorite(data, folder_id, stock_code, market):
             return False
-        original_len = len(data['favorites'][folder_id])
-        data['favorites'][folder_id] = [
-            f for f in data['favorites'][folder_id]
-            if not (f['code'] == stock_code and f.get('market', 'kr') == market)
-        ]
-        if len(data['favorites'][folder_id]) < original_len:
+        self.save(user_id)
+        return True
+
+    def remove_favorites(self, user_id: str, items: list[dict]) -> int:
+        """즐겨찾기 일괄 제거 (저장 1회) - items: [{'folder_id', 'code', 'market'}], 제거된 개수 반환"""
+        data = self.load(user_id)
+        removed = sum(
+            self._delete_favorite(data, item['folder_id'], item['code'], item.get('market', 'kr'))
+            for item in items
+        )
+        if removed:
             self.save(user_id)
-            return True
-        return False
+        return removed
 
     def move_favorite(self, user_id: str, stock_code: str, from_folder: str, to_folder: str, market: str = 'kr') -> bool:
         """즐겨찾기를 다른 폴더로 이동"""
         data = self.load(user_id)
         if from_folder not in data['favorites'] or to_folder not in data['favorites']:
             return False
-        # 원본 폴더에서 찾기
-        stock_item = None
-        for fav in data['favorites'][from_folder]:
-            if fav['code'] == stock_code and fav.get('market', 'kr') == market:
-                stock_item = fav
-                break
+        key = self._fav_key(stock_code, market)
+        stock_item = data['favorites'][from_folder].pop(key, None)
         if not stock_item:
             return False
-        # 이동
-        data['favorites'][from_folder] = [
-            f for f in data['favorites'][from_folder]
-            if not (f['code'] == stock_code and f.get('market', 'kr') == market)
-        ]
-        data['favorites'][to_folder].append(stock_item)
+        data['favorites'][to_folder][key] = stock_item
+        self._index_remove(data, key, from_folder)
+        self._index_add(data, key, to_folder)
         self.save(user_id)
         return True
 
     def reorder_favorites(self, user_id: str, folder_id: str, favorite_keys: list) -> bool:
         """즐겨찾기 순서 변경 (favorite_keys: ['market_code', ...])"""
         data = self.load(user_id)
-        if folder_id not in data['favorites']:
+        favs = data['favorites'].get(folder_id)
+        if favs is None:
             return False
-        fav_map = {f"{f.get('market', 'kr')}_{f['code']}": f for f in data['favorites'][folder_id]}
-        new_favorites = []
-        for key in favorite_keys:
-            if key in fav_map:
-                new_favorites.append(fav_map[key])
-        # 혹시 누락된 즐겨찾기가 있으면 추가
-        for fav in data['favorites'][folder_id]:
-            key = f"{fav.get('market', 'kr')}_{fav['code']}"
-            if key not in favorite_keys:
-                new_favorites.append(fav)
-        data['favorites'][folder_id] = new_favorites
+        # 요청 순서대로 안정 정렬 (누락된 즐겨찾기는 기존 순서 그대로 뒤에)
+        order_index = self._order_index(favorite_keys)
+        missing = len(order_index)
+        data['favorites'][folder_id] = dict(
+            sorted(favs.items(), key=lambda kv: order_index.get(kv[0], missing)))
         self.save(user_id)
         return True
 
     def get_favorites(self, user_id: str, folder_id: str) -> list:
         """폴더의 즐겨찾기 목록 반환"""
         data = self.load(user_id)
-        return data['favorites'].get(folder_id, [])
+        return list(data['favorites'].get(folder_id, {}).values())
 
     def get_all_favorites(self, user_id: str) -> list:
         """모든 즐겨찾기 목록 반환"""
         data = self.load(user_id)
         all_favorites = []
         for folder_id, favorites in data['favorites'].items():
-            for fav in favorites:
+            for fav in favorites.values():
                 all_favorites.append({**fav, 'folder_id': folder_id})
         return all_favorites
 
     def is_favorite(self, user_id: str, stock_code: str, market: str = 'kr') -> dict:
         """즐겨찾기 여부 및 폴더 정보 반환"""
         data = self.load(user_id)
-        for folder_id, favorites in data['favorites'].items():
-            for fav in favorites:
-                if fav['code'] == stock_code and fav.get('market', 'kr') == market:
-                    folder_name = next((f['name'] for f in data['folders'] if f['id'] == folder_id), '')
-                    return {'is_favorite': True, 'folder_id': folder_id, 'folder_name': folder_name}
-        return {'is_favorite': False, 'folder_id': None, 'folder_name': None}
+        folder_ids = data['_index'].get(self._fav_key(stock_code, market))
+        if not folder_ids:
+            return {'is_favorite': False, 'folder_id': None, 'folder_name': None}
+        # 여러 폴더에 있으면 기존처럼 폴더 순서상 첫 폴더
+        folder_id = (folder_ids[0] if len(folder_ids) == 1
+                     else next(fid for fid in data['favorites'] if fid in folder_ids))
+        folder = data['_folder_by_id'].get(folder_id)
+        folder_name = folder['name'] if folder else ''
+        return {'is_favorite': True, 'folder_id': folder_id, 'folder_name': folder_name}
 
     # --- 메모 관리 ---
+    # 메모: {market: {code: {'content', 'updated_date'}}}
     def set_memo(self, user_id: str, stock_code: str, memo: str, market: str = 'kr') -> bool:
         """메모 저장"""
         data = self.load(user_id)
-        memo_key = f"{market}_{stock_code}"
-        data['memos'][memo_key] = {
+        data['memos'].setdefault(market, {})[stock_code] = {
             'content': memo,
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': _now_str()
         }
         self.save(user_id)
         return True
 
+    def set_memos(self, user_id: str, items: list[dict]) -> int:
+        """메모 일괄 저장 (저장 1회) - items: [{'code', 'memo', 'market'}], 저장된 개수 반환"""
+        data = self.load(user_id)
+        now = _now_str()
+        for item in items:
+            data['memos'].setdefault(item.get('market', 'kr'), {})[item['code']] = {
+                'content': item['memo'],
+                'updated_date': now
+            }
+        if items:
+            self.save(user_id)
+        return len(items)
+
     def get_memo(self, user_id: str, stock_code: str, market: str = 'kr') -> str:
         """메모 조회"""
         data = self.load(user_id)
-        memo_key = f"{market}_{stock_code}"
-        memo_data = data['memos'].get(memo_key, {})
+        memo_data = data['memos'].get(market, {}).get(stock_code, {})
         return memo_data.get('content', '')
 
     def delete_memo(self, user_id: str, stock_code: str, market: str = 'kr') -> bool:
         """메모 삭제"""
         data = self.load(user_id)
-        memo_key = f"{market}_{stock_code}"
-        if memo_key in data['memos']:
-            del data['memos'][memo_key]
-            self.save(user_id)
-            return True
-        return False
+        market_memos = data['memos'].get(market)
+        if not market_memos or market_memos.pop(stock_code, None) is None:
+            return False
+        if not market_memos:
+            del data['memos'][market]
+        self.save(user_id)
+        return True
 
     def get_all_memos(self, user_id: str) -> list:
         """모든 메모 목록 반환"""
         data = self.load(user_id)
-        result = []
-        for memo_key, memo_data in data['memos'].items():
-            parts = memo_key.split('_', 1)
-            if len(parts) == 2:
-                market, code = parts
-            else:
-                market, code = 'kr', memo_key
-            result.append({
+        return [
+            {
                 'code': code,
                 'market': market,
                 'content': memo_data.get('content', ''),
                 'updated_date': memo_data.get('updated_date', '')
-            })
-        return result
+            }
+            for market, market_memos in data['memos'].items()
+            for code, memo_data in market_memos.items()
+        ]
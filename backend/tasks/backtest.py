@@ -5,6 +5,7 @@
 """
 import os
 import sys
+from datetime import datetime, timedelta
 
 # backend/ 폴더를 sys.path에 추가 (celery worker 실행 시 필요)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -29,6 +30,18 @@ DATABASE_URL = os.getenv(
 
 engine = BacktestEngine()
 
+# SQLAlchemy 엔진 (워커 프로세스당 1개, 첫 태스크에서 생성 → 커넥션 풀 재사용)
+# import 시점에 만들지 않음: prefork 워커가 부모의 커넥션을 공유하지 않도록
+_sa_engine = None
+
+
+def get_sa_engine():
+    """워커 프로세스 공용 SQLAlchemy 엔진 반환"""
+    global _sa_engine
+    if _sa_engine is None:
+        _sa_engine = sa_create_engine(DATABASE_URL, pool_pre_ping=True)
+    return _sa_engine
+
 
 # ─── 기존 지표 기반 태스크 (하위 호환) ──────────────────────────────────────
 
@@ -64,7 +77,7 @@ def run_backtest(
 
     self.update_state(state='PROGRESS', meta={'current': 0, 'total': 100, 'step': 'DB 조회 중'})
 
-    sa_engine = sa_create_engine(DATABASE_URL)
+    sa_engine = get_sa_engine()
     table    = 'kr_stock_daily' if market == 'kr' else 'us_stock_daily'
     code_col = 'code' if market == 'kr' else 'ticker'
 
@@ -94,6 +107,10 @@ def run_backtest(
             'error': '해당 기간에 데이터가 없습니다.',
         }
 
+    # ticker/name은 행마다 반복되는 문자열 → category (groupby/필터가 정수 코드로 동작)
+    df['ticker'] = df['ticker'].astype('category')
+    df['name']   = df['name'].astype('category')
+
     self.update_state(state='PROGRESS', meta={'current': 10, 'total': 100, 'step': '백테스팅 실행 중'})
 
     def on_progress(current: int, total: int):
@@ -187,9 +204,11 @@ def _walk_forward_screening(
             window_start += pd.DateOffset(years=test_years)
             continue
 
-        # 날짜 범위에 해당하는 신호 필터
-        train_sigs = [s for s in entry_signals if s['screening_date'] in set(train_dates)]
-        test_sigs  = [s for s in entry_signals if s['screening_date'] in set(test_dates)]
+        # 날짜 범위에 해당하는 신호 필터 (set은 윈도우당 1회만 생성)
+        train_set = set(train_dates)
+        test_set  = set(test_dates)
+        train_sigs = [s for s in entry_signals if s['screening_date'] in train_set]
+        test_sigs  = [s for s in entry_signals if s['screening_date'] in test_set]
 
         train_ohlcv = ohlcv_df[ohlcv_df['date_str'].between(train_start_str, train_end_str)]
         test_ohlcv  = ohlcv_df[ohlcv_df['date_str'].between(train_end_str, test_end_str)]
@@ -258,7 +277,7 @@ def run_screening_backtest(
     """
     self.update_state(state='PROGRESS', meta={'current': 0, 'total': 100, 'step': 'DB 조회 중'})
 
-    sa_engine = sa_create_engine(DATABASE_URL)
+    sa_engine = get_sa_engine()
     table    = 'kr_stock_daily' if market == 'kr' else 'us_stock_daily'
     code_col = 'code' if market == 'kr' else 'ticker'
 
@@ -296,7 +315,6 @@ def run_screening_backtest(
     buffer_days = hold_calendar_days + (days_after + 5) * 2
 
     # end_range: available_dates에서 last screening date 이후 buffer_days 날짜 찾기
-    from datetime import datetime, timedelta
     last_screening_dt = datetime.strptime(screening_dates[-1], '%Y-%m-%d')
     end_dt = last_screening_dt + timedelta(days=buffer_days)
     end_range = end_dt.strftime('%Y-%m-%d')
@@ -330,10 +348,11 @@ def run_screening_backtest(
             'error': '해당 기간/종목의 OHLCV 데이터가 없습니다.',
         }
 
+    # ticker는 종목 수만큼만 고유값 → category (groupby/필터가 정수 코드로 동작, 메모리 절감)
+    ohlcv_df['ticker'] = ohlcv_df['ticker'].astype('category')
+
     # date_str 컬럼 추가 (Walk-Forward용)
-    ohlcv_df['date_str'] = ohlcv_df['date'].apply(
-        lambda d: d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d)
-    )
+    ohlcv_df['date_str'] = pd.to_datetime(ohlcv_df['date']).dt.strftime('%Y-%m-%d')
 
     self.update_state(state='PROGRESS', meta={'current': 15, 'total': 100, 'step': '백테스팅 실행 중'})
 